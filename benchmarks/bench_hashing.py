@@ -0,0 +1,96 @@
+"""
+Micro-benchmark for SHA256 file hashing throughput.
+
+Compares the original allocate-per-read loop against `hashing.sha256_file`
+(reused buffer, optional page-cache dropping) across chunk sizes.
+
+    python benchmarks/bench_hashing.py [FILE] [--size-mb 1024] [--repeat 3]
+
+Without FILE a temporary file of --size-mb is generated. Results on a file
+larger than RAM (or with a cold cache) reflect disk speed; repeated runs on
+a small file measure the CPU/copy overhead this change targets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from comfy_updater.hashing import sha256_file  # noqa: E402
+
+
+def legacy_sha256_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with file_path.open("rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _measure(label: str, fn, file_path: Path, size: int, repeat: int) -> str:
+    best = float("inf")
+    result = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(file_path)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<40} {size / best / 1e9:7.2f} GB/s  ({best:.3f}s best of {repeat})")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", type=Path)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp_path = None
+    file_path = args.file
+    if file_path is None:
+        handle, name = tempfile.mkstemp(suffix=".bin")
+        tmp_path = Path(name)
+        block = os.urandom(1024 * 1024)
+        with os.fdopen(handle, "wb") as fh:
+            for _ in range(args.size_mb):
+                fh.write(block)
+        file_path = tmp_path
+
+    try:
+        size = file_path.stat().st_size
+        print(f"{file_path} ({size / 1e6:.0f} MB)")
+        expected = _measure("legacy read() 1 MiB", legacy_sha256_file, file_path, size, args.repeat)
+        for chunk_kb in (256, 1024, 4096, 16384):
+            digest = _measure(
+                f"readinto {chunk_kb} KiB",
+                lambda p, c=chunk_kb: sha256_file(p, chunk_size=c * 1024),
+                file_path,
+                size,
+                args.repeat,
+            )
+            assert digest == expected
+        digest = _measure(
+            "readinto 1024 KiB + drop page cache",
+            lambda p: sha256_file(p, drop_cache=True),
+            file_path,
+            size,
+            args.repeat,
+        )
+        assert digest == expected
+    finally:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,295 @@
 from __future__ import annotations
 
-import io
 from pathlib import Path
 import shutil
-import subprocess
+import tempfile
+import threading
 import time
+from typing import Callable
 import requests
+from requests.adapters import HTTPAdapter
 
-from .constants import MODEL_BY_ID_URL, MODEL_PAGE_BASE_URL, MODEL_VERSION_BY_ID_URL, VERSION_BY_HASH_URL
+from .coalescer import RequestCoalescer
+from .constants import (
+    MODEL_BULK_PAGE_SIZE,
+    MODEL_BY_ID_URL,
+    MODEL_PAGE_BASE_URL,
+    MODEL_VERSION_BY_ID_URL,
+    VERSION_BY_HASH_URL,
+)
+from .hedging import Hedger
+from .negative_cache import NegativeCache
+from .payloads import LatestVersion, compact_model
+from .rate_limit import AdaptiveRateLimiter, parse_retry_after, wait_unless_cancelled
+from .response_cache import ResponseCache
+from .thumbnails import SPOOL_MEMORY_BYTES, Image
+from .transcode import TranscodeTimings, Transcoder
+from .video_frames import ProcessSlots, extract_first_frame
 
-try:
-    from PIL import Image
-except Exception:  # pragma: no cover - optional import guard
-    Image = None
+
+# 429/503 replies retried on top of ``max_retries`` before a request gives up.
+MAX_THROTTLED_RETRIES = 20
+# Replies meaning the by-hash endpoint does not take batched ``POST``s at all.
+BATCH_REJECTED_STATUSES = (400, 404, 405)
+
+
+class RequestCancelled(Exception):
+    """The job was cancelled while a request waited for the rate limiter."""
 
 
 class CivitaiClient:
-    def __init__(self, api_key: str, timeout_seconds: int, max_retries: int):
+    def __init__(
+        self,
+        api_key: str,
+        timeout_seconds: int,
+        max_retries: int,
+        max_concurrency: int = 1,
+        requests_per_second: float = 0.0,
+        response_cache: ResponseCache | None = None,
+        hash_batch_size: int = 1,
+        not_found_cache: NegativeCache | None = None,
+        control=None,
+        hedge_percentile: int = 0,
+        session: requests.Session | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        ffmpeg_slots: ProcessSlots | None = None,
+        transcoder: Transcoder | None = None,
+        release_session: Callable[[], None] | None = None,
+    ):
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
-        self.session = requests.Session()
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.hedger = Hedger(hedge_percentile, max_workers=self.max_concurrency * 2)
+        # A session and limiter handed in are shared with other jobs (see
+        # ``CivitaiClientProvider``) and outlive this client; *release_session*
+        # tells the owner this client is done with it.
+        self._owns_session = session is None
+        self._release_session = release_session
+        if session is None:
+            session = build_session(self.max_concurrency * (2 if self.hedger.enabled else 1))
+        self.session = session
+        # Every API call (including retries) draws from one bucket, so the
+        # configured rate holds no matter how many workers are in flight.
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter(requests_per_second, burst=self.max_concurrency)
+        self.rate_limiter = rate_limiter
+        self._throttled_before = rate_limiter.throttled
+        self.ffmpeg_slots = ffmpeg_slots or ProcessSlots(1)
+        self.transcoder = transcoder or Transcoder(0)
+        self.transcode_timings = TranscodeTimings()
+        self.response_cache = response_cache
+        self.not_found_cache = not_found_cache
+        self.control = control
         self.default_headers = {
             "User-Agent": "comfyui-civitai-updater/0.1",
         }
         api_key = (api_key or "").strip()
         if api_key:
             self.default_headers["Authorization"] = f"Bearer {api_key}"
+        # Per-client memo so duplicates and sibling versions hit the API once.
+        self.hash_lookups = RequestCoalescer()
+        self.version_lookups = RequestCoalescer()
+        self.model_lookups = RequestCoalescer()
+        self.hash_batch_size = max(1, int(hash_batch_size))
+        self.batched_lookups = 0
+        self.bulk_model_requests = 0
+
+    @property
+    def shared_lookups(self) -> int:
+        return self.hash_lookups.shared + self.version_lookups.shared
+
+    @property
+    def throttled(self) -> int:
+        """429/503 replies received since this client was created."""
+        return self.rate_limiter.throttled - self._throttled_before
+
+    def network_snapshot(self) -> dict:
+        return {**self.rate_limiter.snapshot(), "throttled": self.throttled}
 
     def get_version_by_hash(self, sha256_hash: str) -> dict | None:
-        return self._get_json(f"{VERSION_BY_HASH_URL}/{sha256_hash}")
+        """Resolve a file hash, answering repeats (duplicate files) and known-unknown hashes from memory."""
+        key = sha256_hash.lower()
+
+        def fetch() -> dict | None:
+            if self.not_found_cache is not None and self.not_found_cache.lookup(key):
+                return None
+            status, version = self._fetch_json(f"{VERSION_BY_HASH_URL}/{sha256_hash}")
+            if status == 404 and self.not_found_cache is not None:
+                self.not_found_cache.record(key)
+            return version
+
+        return self.hash_lookups.get(key, fetch)
+
+    def prefetch_versions_by_hash(self, sha256_hashes: list[str]) -> int:
+        """Resolve many hashes with batched ``POST`` requests to the by-hash endpoint.
+
+        Results (including not-found as None) land in the by-hash memo, so the
+        per-file ``get_version_by_hash`` calls that follow are answered
+        locally. Hashes already known or being fetched are left alone. A
+        failed batch (timeout, server error, bad body) is released and its
+        files fall back to single lookups; later batches are still sent.
+        Only when the endpoint rejects batches (``BATCH_REJECTED_STATUSES``)
+        is batching turned off for the rest of this client's lifetime. Any
+        claim still open when this returns, even on an error, is released.
+        Returns the number of hashes resolved.
+        """
+        if self.hash_batch_size <= 1:
+            return 0
+        claimed = self.hash_lookups.claim([sha256_hash.lower() for sha256_hash in sha256_hashes])
+        settled: set[str] = set()
+
+        def resolve(key: str, version) -> None:
+            self.hash_lookups.resolve(key, version)
+            settled.add(key)
+
+        keys = claimed
+        resolved = 0
+        try:
+            if self.not_found_cache is not None:
+                known = []
+                for key in keys:
+                    if self.not_found_cache.lookup(key):
+                        resolve(key, None)
+                        resolved += 1
+                    else:
+                        known.append(key)
+                keys = known
+            if self.response_cache is not None:
+                # Fresh cached answers need no request at all.
+                uncached = []
+                for key in keys:
+                    cached, _headers = self.response_cache.lookup(f"{VERSION_BY_HASH_URL}/{key}")
+                    if cached is not None:
+                        resolve(key, cached)
+                        resolved += 1
+                    else:
+                        uncached.append(key)
+                keys = uncached
+            for start in range(0, len(keys), self.hash_batch_size):
+                batch = keys[start : start + self.hash_batch_size]
+                try:
+                    response = self._send("POST", VERSION_BY_HASH_URL, json_body=batch)
+                except Exception:  # noqa: BLE001 - the rest fall back to single lookups
+                    break
+                versions = _json_body(response)
+                if not isinstance(versions, list):
+                    if response is not None and response.status_code in BATCH_REJECTED_STATUSES:
+                        self.hash_batch_size = 1
+                        break
+                    for key in batch:
+                        self.hash_lookups.release(key)
+                        settled.add(key)
+                    continue
+                self.batched_lookups += 1
+                wanted = set(batch)
+                found: dict[str, dict] = {}
+                for version in versions:
+                    if not isinstance(version, dict):
+                        continue
+                    for file_info in version.get("files") or []:
+                        if not isinstance(file_info, dict):
+                            continue
+                        hashes = file_info.get("hashes")
+                        file_hash = str((hashes if isinstance(hashes, dict) else {}).get("SHA256") or "").lower()
+                        if file_hash in wanted:
+                            found[file_hash] = version
+                for key in batch:
+                    version = found.get(key)
+                    if version is not None and self.response_cache is not None:
+                        self.response_cache.store(f"{VERSION_BY_HASH_URL}/{key}", version)
+                    if version is None and self.not_found_cache is not None:
+                        self.not_found_cache.record(key)
+                    resolve(key, version)
+                    resolved += 1
+        finally:
+            # Waiters must never be left on a claim nobody resolves: whatever
+            # is still open falls back to single lookups.
+            for key in claimed:
+                if key not in settled:
+                    self.hash_lookups.release(key)
+        return resolved
+
+    def prefetch_models(self, model_ids: list[str]) -> int:
+        """Load many model payloads through the paginated ``/models?ids=`` listing.
+
+        Each returned model is compacted into the latest-version memo (and
+        response cache) so ``get_latest_version_for_model`` answers locally. Ids the listing does not return,
+        e.g. deleted or restricted models, are released and fetched one by
+        one if anything asks for them. Returns the number of models loaded.
+        """
+        claimed = self.model_lookups.claim([str(model_id) for model_id in model_ids])
+        settled: set[str] = set()
+
+        def resolve(key: str, model: dict) -> None:
+            self.model_lookups.resolve(key, LatestVersion.from_model(model))
+            settled.add(key)
+
+        keys = claimed
+        loaded = 0
+        try:
+            if self.response_cache is not None:
+                uncached = []
+                for key in keys:
+                    cached, _headers = self.response_cache.lookup(f"{MODEL_BY_ID_URL}/{key}")
+                    if cached is not None:
+                        resolve(key, cached)
+                        loaded += 1
+                    else:
+                        uncached.append(key)
+                keys = uncached
+
+            for start in range(0, len(keys), MODEL_BULK_PAGE_SIZE):
+                chunk = keys[start : start + MODEL_BULK_PAGE_SIZE]
+                wanted = set(chunk)
+                query = "&".join(f"ids={key}" for key in chunk)
+                url = f"{MODEL_BY_ID_URL}?{query}&limit={MODEL_BULK_PAGE_SIZE}&nsfw=true"
+                while url:
+                    page = self._get_listing(url)
+                    if not page:
+                        break
+                    self.bulk_model_requests += 1
+                    for model in page.get("items") or []:
+                        if not isinstance(model, dict):
+                            continue
+                        key = str(model.get("id", ""))
+                        if key not in wanted:
+                            continue
+                        wanted.discard(key)
+                        model = compact_model(model)
+                        if self.response_cache is not None:
+                            self.response_cache.store(f"{MODEL_BY_ID_URL}/{key}", model)
+                        resolve(key, model)
+                        loaded += 1
+                    url = str((page.get("metadata") or {}).get("nextPage") or "") if wanted else ""
+        finally:
+            # Ids not loaded, including later chunks when a request raised
+            # (e.g. ``RequestCancelled``), fall back to single fetches.
+            for key in claimed:
+                if key not in settled:
+                    self.model_lookups.release(key)
+        return loaded
 
     def get_model(self, model_id: int | str) -> dict | None:
-        return self._get_json(f"{MODEL_BY_ID_URL}/{model_id}")
+        """Fetch a model payload, projected to the fields the updater reads (see ``compact_model``)."""
+        return self._get_json(f"{MODEL_BY_ID_URL}/{model_id}", project=compact_model)
 
     def get_version(self, version_id: int | str) -> dict | None:
-        return self._get_json(f"{MODEL_VERSION_BY_ID_URL}/{version_id}")
+        """Fetch a version by id once per client, however many local copies refer to it."""
+        key = str(version_id)
+        return self.version_lookups.get(key, lambda: self._get_json(f"{MODEL_VERSION_BY_ID_URL}/{key}"))
 
-    def get_latest_version_for_model(self, model_id: int | str) -> dict | None:
+    def get_latest_version_for_model(self, model_id: int | str) -> LatestVersion | None:
         """Return the primary version as determined by Civitai (first in the array).
 
         The API returns modelVersions ordered by the creator's chosen `index`,
         not by date. Sorting by createdAt would override the creator's intent —
         e.g. a Wan Video variant added after the main Flux version would wrongly
         appear as the "latest".
+
+        Fetched once per client however many local versions ask; only the
+        compact record is kept.
         """
-        model = self.get_model(model_id)
-        if not model:
-            return None
-        versions = model.get("modelVersions") or []
-        if not versions:
-            return None
-        latest = versions[0]
-        creator = model.get("creator")
-        if isinstance(creator, dict):
-            latest["_creatorName"] = creator.get("username") or ""
-        return latest
+        return self.model_lookups.get(str(model_id), lambda: LatestVersion.from_model(self.get_model(model_id)))
 
     def model_page_url(self, model_id: int | str) -> str:
         return f"{MODEL_PAGE_BASE_URL}/{model_id}"
@@ -89,41 +324,68 @@ class CivitaiClient:
                 target_path.with_suffix(f"{target_path.suffix}.tmp").unlink(missing_ok=True)
             return False
 
-    def download_image_as_png(self, url: str, target_path: Path, max_bytes: int = 10_000_000) -> bool:
-        """Download an image URL and save it as a PNG file."""
-        data = self._download_bytes(url, max_bytes=max_bytes)
-        if not data:
-            return False
+    def download_image_as_png(
+        self,
+        url: str,
+        target_path: Path,
+        max_bytes: int = 10_000_000,
+        max_dimension: int = 0,
+    ) -> bool:
+        """Download an image URL and save it as a PNG file (plus a WebP copy).
 
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = target_path.with_suffix(f"{target_path.suffix}.tmp")
-        try:
-            if Image is None:
-                if not _is_png_data(data):
-                    return False
+        The image is scaled down to *max_dimension* (0 keeps the full size)
+        by the transcoder. With transcode workers the body is streamed to a
+        temp file next to the target, which a worker decodes from disk;
+        otherwise into a spooled buffer, in memory up to
+        ``SPOOL_MEMORY_BYTES`` and on disk beyond, decoded on this thread.
+        """
+        if Image is not None and self.transcoder.workers:
+            tmp_download = target_path.with_suffix(".preview_download.tmp")
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with tmp_download.open("wb") as fh:
+                    if not self._download_to(url, fh, max_bytes=max_bytes):
+                        return False
+                return self._transcode_to(tmp_download, target_path, max_dimension)
+            except OSError:
+                return False
+            finally:
+                tmp_download.unlink(missing_ok=True)
+
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+            if not self._download_to(url, spool, max_bytes=max_bytes):
+                return False
+            spool.seek(0)
+            if Image is not None:
+                return self._transcode_to(spool, target_path, max_dimension)
+
+            if not _is_png_data(spool.read(8)):
+                return False
+            spool.seek(0)
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target_path.with_suffix(f"{target_path.suffix}.tmp")
+            try:
                 with tmp_path.open("wb") as fh:
-                    fh.write(data)
+                    shutil.copyfileobj(spool, fh)
                 tmp_path.replace(target_path)
                 return True
-
-            with Image.open(io.BytesIO(data)) as image:
-                if image.mode not in ("RGB", "RGBA"):
-                    has_alpha = "A" in image.getbands()
-                    image = image.convert("RGBA" if has_alpha else "RGB")
-                image.save(tmp_path, format="PNG")
-            tmp_path.replace(target_path)
-            return True
-        except Exception:  # noqa: BLE001
-            tmp_path.unlink(missing_ok=True)
-            return False
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+                return False
 
     def download_video_first_frame_as_png(
         self,
         url: str,
         target_path: Path,
         max_bytes: int = 25_000_000,
+        max_dimension: int = 0,
     ) -> bool:
-        """Download a video URL and extract its first frame to PNG via ffmpeg."""
+        """Extract the first frame of a video URL to PNG via ffmpeg.
+
+        Only the leading bytes are requested (``Range``) and fed to ffmpeg as
+        they arrive; the whole file is fetched only when its ``moov`` atom
+        sits at the end (see ``extract_first_frame``).
+        """
         ffmpeg_path = shutil.which("ffmpeg")
         if not ffmpeg_path:
             return False
@@ -132,88 +394,231 @@ class CivitaiClient:
         tmp_video = target_path.with_suffix(".preview_video.tmp.mp4")
         tmp_png = target_path.with_suffix(".preview_frame.tmp.png")
 
-        if not self.download_file(url, tmp_video, max_bytes=max_bytes):
-            return False
-
         try:
-            process = subprocess.run(  # noqa: S603
-                [
-                    ffmpeg_path,
-                    "-y",
-                    "-loglevel",
-                    "error",
-                    "-i",
-                    str(tmp_video),
-                    "-frames:v",
-                    "1",
-                    str(tmp_png),
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            if process.returncode != 0 or not tmp_png.exists() or tmp_png.stat().st_size == 0:
-                tmp_png.unlink(missing_ok=True)
-                return False
+            with self.session.get(
+                url,
+                timeout=self.timeout_seconds,
+                headers={**self.default_headers, "Range": f"bytes=0-{max_bytes - 1}"},
+                stream=True,
+            ) as response:
+                if not response.ok:
+                    return False
+                chunks = _capped(response.iter_content(chunk_size=65536), max_bytes)
+                if not extract_first_frame(ffmpeg_path, chunks, tmp_png, tmp_video, self.ffmpeg_slots):
+                    return False
+            if Image is not None:
+                return self._transcode_to(tmp_png, target_path, max_dimension)
             tmp_png.replace(target_path)
             return True
         except Exception:  # noqa: BLE001
-            tmp_png.unlink(missing_ok=True)
             return False
         finally:
             tmp_video.unlink(missing_ok=True)
+            tmp_png.unlink(missing_ok=True)
+
+    def _transcode_to(self, source, target_path: Path, max_dimension: int) -> bool:
+        return self.transcoder.transcode(source, target_path, max_dimension, self.transcode_timings)
+
+    def _get_json(self, url: str, project: Callable[[dict], dict | None] | None = None) -> dict | None:
+        return self._fetch_json(url, project)[1]
+
+    def _fetch_json(
+        self, url: str, project: Callable[[dict], dict | None] | None = None
+    ) -> tuple[int | None, dict | None]:
+        """GET *url* through the response cache; returns ``(status, payload)``.
+
+        The status is None when no answer arrived, so a ``404`` can be told
+        apart from an outage. *project* trims the payload before it is cached
+        or returned, so the raw JSON is released right after parsing.
+        """
+        project = project or _unchanged
+        conditional_headers: dict[str, str] = {}
+        if self.response_cache is not None:
+            cached, conditional_headers = self.response_cache.lookup(url)
+            if cached is not None:
+                return 200, project(cached)
+
+        response = self._send_hedged(url, conditional_headers)
+        if response is not None and response.status_code == 304:
+            cached = self.response_cache.revalidate(url) if self.response_cache is not None else None
+            if cached is not None:
+                return 200, project(cached)
+            # The entry vanished between lookup and reply; ask again unconditionally.
+            response = self._send("GET", url)
+        if response is None:
+            return None, None
+        if not response.ok:
+            return response.status_code, None
+        try:
+            data = project(response.json())
+        except ValueError:
+            return response.status_code, None
+        if self.response_cache is not None:
+            self.response_cache.store(
+                url,
+                data,
+                etag=response.headers.get("ETag", ""),
+                last_modified=response.headers.get("Last-Modified", ""),
+            )
+        return response.status_code, data
+
+    def _get_listing(self, url: str) -> dict | None:
+        """GET a paginated listing; pages are never response-cached."""
+        response = self._send("GET", url)
+        if response is None or not response.ok:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _send_hedged(self, url: str, headers: dict) -> requests.Response | None:
+        """GET *url*, sending a duplicate if it is slow (see ``Hedger``).
+
+        The duplicate goes through ``_send`` too, so it waits for the rate
+        limiter like any other request.
+        """
+        return self.hedger.run(lambda started: self._send("GET", url, headers=headers, started=started))
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict | None = None,
+        json_body=None,
+        started: threading.Event | None = None,
+    ) -> requests.Response | None:
+        """Send one API request with rate limiting and retries.
 
-    def _get_json(self, url: str) -> dict | None:
+        Returns the response for successes, ``304`` and client errors that
+        retrying cannot fix, and None once retries are exhausted. Raises
+        ``RequestCancelled`` if the job is cancelled while waiting for the
+        limiter or between retries. *started* is set once the request is on the wire, and then
+        its latency feeds the hedger.
+        """
         last_error = None
-        for attempt in range(self.max_retries + 1):
+        attempt = 0
+        throttled = 0
+        while True:
+            if not self.rate_limiter.acquire(self._is_cancelled):
+                # Not a "not found": callers must not act on a missing answer.
+                raise RequestCancelled(url)
+            if started is not None:
+                started.set()
+            sent_at = time.monotonic()
             try:
-                response = self.session.get(
+                response = self.session.request(
+                    method,
                     url,
                     timeout=self.timeout_seconds,
-                    headers=self.default_headers,
+                    headers={**self.default_headers, **(headers or {})},
+                    json=json_body,
                 )
             except requests.RequestException as exc:
                 last_error = str(exc)
-                response = None
+                self.rate_limiter.on_failure()
             else:
-                if response.ok:
-                    try:
-                        return response.json()
-                    except ValueError:
-                        return None
-                if response.status_code in (400, 401, 403, 404):
-                    return None
-                last_error = f"{response.status_code} {response.reason}"
-
-            if attempt < self.max_retries:
-                time.sleep(_retry_delay_seconds(attempt))
+                if response.status_code in (429, 503):
+                    last_error = f"{response.status_code} {response.reason}"
+                    self.rate_limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                    if response.status_code == 503:
+                        self.rate_limiter.on_failure()
+                    # Throttling is paced by the limiter (reduced rate plus the
+                    # Retry-After hold) and does not use up the retry budget.
+                    throttled += 1
+                    if throttled <= MAX_THROTTLED_RETRIES:
+                        continue
+                elif response.ok or response.status_code in (304, 400, 401, 403, 404):
+                    self.rate_limiter.on_success()
+                    if started is not None:
+                        self.hedger.record(time.monotonic() - sent_at)
+                    return response
+                else:
+                    last_error = f"{response.status_code} {response.reason}"
+                    self.rate_limiter.on_failure()
+
+            if attempt >= self.max_retries:
+                break
+            if not wait_unless_cancelled(_retry_delay_seconds(attempt), self._is_cancelled):
+                raise RequestCancelled(url)
+            attempt += 1
 
         if last_error:
             print(f"Civitai updater request failed: {url} :: {last_error}")
         return None
 
-    def _download_bytes(self, url: str, max_bytes: int) -> bytes | None:
+    def close(self) -> None:
+        self.hedger.close()
+        if self._owns_session:
+            self.session.close()
+        elif self._release_session is not None:
+            release, self._release_session = self._release_session, None
+            release()
+
+    def _is_cancelled(self) -> bool:
+        return self.control is not None and self.control.is_cancelled()
+
+    def _download_to(self, url: str, fh, max_bytes: int) -> bool:
+        """Stream *url* into the binary file *fh*; False on errors or past *max_bytes*."""
         try:
-            response = self.session.get(
+            with self.session.get(
                 url,
                 timeout=self.timeout_seconds,
                 headers=self.default_headers,
                 stream=True,
-            )
-            if not response.ok:
-                return None
-            chunks: list[bytes] = []
-            written = 0
-            for chunk in response.iter_content(chunk_size=8192):
-                if not chunk:
-                    continue
-                written += len(chunk)
-                if written > max_bytes:
-                    return None
-                chunks.append(chunk)
-            return b"".join(chunks)
+            ) as response:
+                if not response.ok:
+                    return False
+                written = 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    if not chunk:
+                        continue
+                    written += len(chunk)
+                    if written > max_bytes:
+                        return False
+                    fh.write(chunk)
+                return written > 0
         except Exception:  # noqa: BLE001
-            return None
+            return False
+
+
+def build_session(pool_size: int) -> requests.Session:
+    """A session with *pool_size* keep-alive connections per host.
+
+    Size it to the requests that can be in flight at once, so parallel
+    lookups reuse TLS sessions instead of reconnecting.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, int(pool_size)))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _capped(chunks, max_bytes: int):
+    """Yield *chunks* until *max_bytes* have passed (for servers that ignore ``Range``)."""
+    remaining = max_bytes
+    for chunk in chunks:
+        if not chunk:
+            continue
+        yield chunk[:remaining]
+        remaining -= len(chunk)
+        if remaining <= 0:
+            return
+
+
+def _unchanged(payload):
+    return payload
+
+
+def _json_body(response: requests.Response | None):
+    if response is None or not response.ok:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return None
 
 
 def _retry_delay_seconds(attempt: int) -> float:
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from functools import partial
+import threading
+
+from .civitai_client import CivitaiClient, build_session
+from .rate_limit import AdaptiveRateLimiter, rate_from_delay_ms
+from .transcode import Transcoder
+from .video_frames import ProcessSlots
+
+
+class CivitaiClientProvider:
+    """Process-wide Civitai connection state shared by every job.
+
+    The ``requests`` session (with its warm keep-alive connections) and the
+    adaptive rate limiter live as long as the plugin. Each job gets its own
+    ``CivitaiClient`` on top of them, so lookup memos, counters, the response
+    cache TTL and cancellation stay per job. The session is rebuilt only when
+    ``apiKey``, ``requestTimeoutSeconds``, ``maxRetries`` or the pool size
+    change; the limiter only when the request rate or concurrency does.
+    A replaced session is closed once the last job using it closes its
+    client.
+    The ffmpeg limit and the transcode pool are process-wide too, so
+    concurrent jobs share them.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._session_key: tuple | None = None
+        # Jobs holding each session, keyed by id(); retired sessions close at 0.
+        self._session_users: dict[int, int] = {}
+        self._rate_limiter: AdaptiveRateLimiter | None = None
+        self._rate_limiter_key: tuple | None = None
+        self.ffmpeg_slots = ProcessSlots(2)
+        self.transcoder = Transcoder()
+        self._lock = threading.Lock()
+
+    def client_for_job(self, config: dict, **job_state) -> CivitaiClient:
+        """Build a job's client from *config* over the shared session and limiter.
+
+        *job_state* is passed through to ``CivitaiClient`` (response cache,
+        batch size, not-found cache, job control, hedging).
+        """
+        api_key = config.get("apiKey", "")
+        timeout_seconds = int(config.get("requestTimeoutSeconds", 30))
+        max_retries = int(config.get("maxRetries", 4))
+        max_concurrency = int(config.get("maxConcurrentRequests", 4))
+        requests_per_second = rate_from_delay_ms(config.get("requestDelayMs", 120))
+        with self._lock:
+            session_key = (api_key, timeout_seconds, max_retries, connection_pool_size(config))
+            if self._session is None or session_key != self._session_key:
+                # A job still running keeps the old session until it finishes.
+                retired = self._session
+                self._session = build_session(session_key[-1])
+                self._session_key = session_key
+                if retired is not None and not self._session_users.get(id(retired)):
+                    self._session_users.pop(id(retired), None)
+                    retired.close()
+            rate_limiter_key = (requests_per_second, max_concurrency)
+            if self._rate_limiter is None or rate_limiter_key != self._rate_limiter_key:
+                self._rate_limiter = AdaptiveRateLimiter(requests_per_second, burst=max_concurrency)
+                self._rate_limiter_key = rate_limiter_key
+            session, rate_limiter = self._session, self._rate_limiter
+            self._session_users[id(session)] = self._session_users.get(id(session), 0) + 1
+        self.ffmpeg_slots.resize(int(config.get("ffmpegConcurrency", 2)))
+        self.transcoder.resize(int(config.get("transcodeWorkers", 2)))
+        return CivitaiClient(
+            api_key=api_key,
+            timeout_seconds=timeout_seconds,
+            max_retries=max_retries,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            session=session,
+            rate_limiter=rate_limiter,
+            ffmpeg_slots=self.ffmpeg_slots,
+            transcoder=self.transcoder,
+            release_session=partial(self._release_session, session),
+            **job_state,
+        )
+
+    def _release_session(self, session) -> None:
+        """A job's client is done with *session*; close it if it was replaced meanwhile."""
+        with self._lock:
+            users = self._session_users.get(id(session), 0) - 1
+            if users > 0 or session is self._session:
+                self._session_users[id(session)] = max(0, users)
+                return
+            self._session_users.pop(id(session), None)
+        session.close()
+
+
+def connection_pool_size(config: dict) -> int:
+    """Configured ``connectionPoolSize``, or one connection per request a job can have in flight."""
+    configured = int(config.get("connectionPoolSize", 0))
+    if configured > 0:
+        return configured
+    concurrency = int(config.get("maxConcurrentRequests", 4))
+    return concurrency * (2 if config.get("hedgeRequests") else 1)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+
+class RequestCoalescer:
+    """Per-job singleflight memo: one fetch per key, shared by every caller.
+
+    Concurrent callers for a key that is already being fetched wait for that
+    fetch instead of starting their own; later callers get the remembered
+    result. ``shared`` counts the calls that were answered by another
+    caller's fetch; the first read of a prefetched result does not count.
+    If the fetch raises, waiters retry it themselves.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._results: dict[str, object] = {}
+        self._pending: dict[str, threading.Event] = {}
+        self._prefetched: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, fetch: Callable[[], object]):
+        while True:
+            with self._lock:
+                if key in self._results:
+                    if key in self._prefetched:
+                        self._prefetched.discard(key)
+                    else:
+                        self.shared += 1
+                    return self._results[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+        try:
+            result = fetch()
+            with self._lock:
+                self._results[key] = result
+            return result
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set()
+
+    def claim(self, keys: list[str]) -> list[str]:
+        """Mark keys as being fetched by the caller (e.g. as one bulk request).
+
+        Returns the keys actually claimed: those neither known nor already in
+        flight. Every claimed key must later be passed to ``resolve`` or
+        ``release``; until then other callers wait for it.
+        """
+        claimed: list[str] = []
+        with self._lock:
+            for key in keys:
+                if key in self._results or key in self._pending:
+                    continue
+                self._pending[key] = threading.Event()
+                claimed.append(key)
+        return claimed
+
+    def resolve(self, key: str, result) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._prefetched.add(key)
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set()
+
+    def release(self, key: str) -> None:
+        """Give up a claimed key; a waiting caller then fetches it itself."""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set()
+
+    def seed(self, key: str, result) -> None:
+        """Remember a result obtained some other way (e.g. a bulk request)."""
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = result
+                self._prefetched.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._results
@@ -4,7 +4,7 @@ import json
 from copy import deepcopy
 from pathlib import Path
 
-from .constants import SUPPORTED_MODEL_TYPES
+from .constants import DEFAULT_DEVICE_LIMITS, DEVICE_KINDS, SUPPORTED_MODEL_TYPES
 
 
 DEFAULT_CONFIG = {
@@ -13,6 +13,22 @@ DEFAULT_CONFIG = {
     "requestTimeoutSeconds": 30,
     "maxRetries": 4,
     "requestDelayMs": 120,
+    "maxConcurrentRequests": 4,
+    "connectionPoolSize": 0,
+    "hashBatchSize": 50,
+    "notFoundTtlHours": 24,
+    "hedgeRequests": False,
+    "hedgePercentile": 95,
+    "previewWorkers": 2,
+    "previewDelayMs": 50,
+    "previewMaxDimension": 512,
+    "ffmpegConcurrency": 2,
+    "transcodeWorkers": 2,
+    "hashWorkers": 4,
+    "hashDeviceLimits": dict(DEFAULT_DEVICE_LIMITS),
+    "hashChunkSizeKb": 1024,
+    "hashDropPageCache": True,
+    "importExternalHashes": True,
     "useComfyPaths": True,
     "useExtraModelPaths": True,
     "useCustomPaths": True,
@@ -53,6 +69,21 @@ class ConfigStore:
             "requestTimeoutSeconds",
             "maxRetries",
             "requestDelayMs",
+            "maxConcurrentRequests",
+            "connectionPoolSize",
+            "hashBatchSize",
+            "notFoundTtlHours",
+            "hedgeRequests",
+            "hedgePercentile",
+            "previewWorkers",
+            "previewDelayMs",
+            "previewMaxDimension",
+            "ffmpegConcurrency",
+            "transcodeWorkers",
+            "hashWorkers",
+            "hashChunkSizeKb",
+            "hashDropPageCache",
+            "importExternalHashes",
             "useComfyPaths",
             "useExtraModelPaths",
             "useCustomPaths",
@@ -83,12 +114,59 @@ class ConfigStore:
         merged["requestDelayMs"] = _int_in_range(
             merged["requestDelayMs"], default=120, minimum=0, maximum=3000
         )
+        merged["maxConcurrentRequests"] = _int_in_range(
+            merged["maxConcurrentRequests"], default=4, minimum=1, maximum=16
+        )
+        merged["connectionPoolSize"] = _int_in_range(
+            merged["connectionPoolSize"], default=0, minimum=0, maximum=64
+        )
+        merged["hashBatchSize"] = _int_in_range(
+            merged["hashBatchSize"], default=50, minimum=1, maximum=100
+        )
+        merged["notFoundTtlHours"] = _int_in_range(
+            merged["notFoundTtlHours"], default=24, minimum=0, maximum=720
+        )
+        merged["hedgePercentile"] = _int_in_range(
+            merged["hedgePercentile"], default=95, minimum=50, maximum=99
+        )
+        merged["previewWorkers"] = _int_in_range(
+            merged["previewWorkers"], default=2, minimum=1, maximum=8
+        )
+        merged["previewDelayMs"] = _int_in_range(
+            merged["previewDelayMs"], default=50, minimum=0, maximum=3000
+        )
+        merged["previewMaxDimension"] = _int_in_range(
+            merged["previewMaxDimension"], default=512, minimum=0, maximum=4096
+        )
+        merged["ffmpegConcurrency"] = _int_in_range(
+            merged["ffmpegConcurrency"], default=2, minimum=1, maximum=8
+        )
+        merged["transcodeWorkers"] = _int_in_range(
+            merged["transcodeWorkers"], default=2, minimum=0, maximum=8
+        )
+        device_limits = incoming.get("hashDeviceLimits", {})
+        if isinstance(device_limits, dict):
+            for kind in DEVICE_KINDS:
+                if kind in device_limits:
+                    merged["hashDeviceLimits"][kind] = _int_in_range(
+                        device_limits[kind], default=DEFAULT_DEVICE_LIMITS[kind], minimum=1, maximum=32
+                    )
+
+        merged["hashWorkers"] = _int_in_range(
+            merged["hashWorkers"], default=4, minimum=1, maximum=32
+        )
+        merged["hashChunkSizeKb"] = _int_in_range(
+            merged["hashChunkSizeKb"], default=1024, minimum=64, maximum=65536
+        )
 
         if not isinstance(merged["apiKey"], str):
             merged["apiKey"] = ""
         merged["useComfyPaths"] = bool(merged["useComfyPaths"])
         merged["useExtraModelPaths"] = bool(merged["useExtraModelPaths"])
         merged["useCustomPaths"] = bool(merged["useCustomPaths"])
+        merged["hedgeRequests"] = bool(merged["hedgeRequests"])
+        merged["hashDropPageCache"] = bool(merged["hashDropPageCache"])
+        merged["importExternalHashes"] = bool(merged["importExternalHashes"])
 
         return merged
 
@@ -109,6 +187,11 @@ class ConfigStore:
 
     def update(self, incoming: dict) -> dict:
         incoming = incoming or {}
+        if isinstance(incoming.get("hashDeviceLimits"), dict):
+            incoming = {
+                **incoming,
+                "hashDeviceLimits": {**self._config["hashDeviceLimits"], **incoming["hashDeviceLimits"]},
+            }
         merged = self._merged({**self._config, **incoming})
         if "customPaths" in incoming and isinstance(incoming["customPaths"], dict):
             current_custom = deepcopy(self._config.get("customPaths", {}))
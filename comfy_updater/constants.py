@@ -7,6 +7,9 @@ VERSION_BY_HASH_URL = f"{API_BASE_URL}/model-versions/by-hash"
 MODEL_BY_ID_URL = f"{API_BASE_URL}/models"
 MODEL_VERSION_BY_ID_URL = f"{API_BASE_URL}/model-versions"
 
+# Largest `ids` list (and page size) the /models listing accepts per request.
+MODEL_BULK_PAGE_SIZE = 100
+
 SUPPORTED_MODEL_TYPES = ("checkpoint", "lora", "vae", "unet", "embedding")
 
 MODEL_TYPE_TO_COMFY_KEYS = {
@@ -32,3 +35,13 @@ SUPPORTED_MODEL_EXTENSIONS = (
 INFO_SIDECAR_SUFFIX = ".civitai.info"
 PREVIEW_SIDECAR_SUFFIX = ".preview.png"
 
+
+DEVICE_KINDS = ("ssd", "hdd", "network", "unknown")
+
+# Concurrent hashes allowed per storage device, by device kind.
+DEFAULT_DEVICE_LIMITS = {
+    "ssd": 4,
+    "hdd": 1,
+    "network": 2,
+    "unknown": 2,
+}
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import os
+from pathlib import Path
+
+from .constants import DEFAULT_DEVICE_LIMITS
+from .path_resolver import group_model_files_by_device
+
+_NETWORK_FS_TYPES = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "9p",
+    "ceph",
+    "glusterfs",
+    "fuse.sshfs",
+    "fuse.rclone",
+    "fuse.s3fs",
+    "afs",
+}
+
+
+@lru_cache(maxsize=None)
+def device_kind(device: int) -> str:
+    """Classify a ``st_dev`` as ssd, hdd, network or unknown.
+
+    Only Linux exposes enough through /proc and /sys to tell; everything else
+    reports ``unknown`` and gets the middle-of-the-road limit.
+    """
+    if device < 0 or not Path("/proc/self/mountinfo").is_file():
+        return "unknown"
+    major, minor = os.major(device), os.minor(device)
+    if _mount_fs_type(major, minor) in _NETWORK_FS_TYPES:
+        return "network"
+    rotational = _read_rotational(major, minor)
+    if rotational is None:
+        return "unknown"
+    return "hdd" if rotational else "ssd"
+
+
+def device_limit(device: int, limits: dict[str, int]) -> int:
+    kind = device_kind(device)
+    return max(1, int(limits.get(kind, DEFAULT_DEVICE_LIMITS[kind])))
+
+
+def order_for_devices(files: list[dict]) -> list[dict]:
+    """Order model files so hashing stays sequential per spindle but spreads across disks.
+
+    Files are grouped by ``st_dev``; rotational devices are read in inode order
+    (a cheap proxy for on-disk layout), and the groups are interleaved so the
+    hash prefetch window always holds work for every device.
+    """
+    groups = group_model_files_by_device(files)
+    queues: list[list[dict]] = []
+    for device, entries in groups.items():
+        if device_kind(device) == "hdd":
+            entries = sorted(entries, key=lambda entry: entry.get("inode", 0))
+        queues.append(entries)
+
+    ordered: list[dict] = []
+    position = 0
+    while len(ordered) < len(files):
+        for queue in queues:
+            if position < len(queue):
+                ordered.append(queue[position])
+        position += 1
+    return ordered
+
+
+def _mount_fs_type(major: int, minor: int) -> str:
+    wanted = f"{major}:{minor}"
+    try:
+        lines = Path("/proc/self/mountinfo").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return ""
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3 or fields[2] != wanted or " - " not in line:
+            continue
+        post = line.split(" - ", 1)[1].split()
+        if post:
+            return post[0]
+    return ""
+
+
+def _read_rotational(major: int, minor: int) -> bool | None:
+    block = Path(f"/sys/dev/block/{major}:{minor}")
+    # Partitions have no queue/ of their own; the parent disk does.
+    for candidate in (block / "queue" / "rotational", block / ".." / "queue" / "rotational"):
+        try:
+            return candidate.read_text(encoding="utf-8").strip() == "1"
+        except OSError:
+            continue
+    return None
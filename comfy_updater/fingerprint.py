@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from .hashing import sample_fingerprint
+from .model_headers import read_model_header
+
+UNCHANGED = "unchanged"
+TOUCHED = "touched"
+CHANGED = "changed"
+MISSING = "missing"
+
+
+def build_fingerprint(file_path: Path, stat_result: os.stat_result | None = None) -> dict:
+    """Fast change-detection record stored in the sidecar's ``extensions.fingerprint``."""
+    stat_result = stat_result or file_path.stat()
+    fingerprint = {
+        "size": stat_result.st_size,
+        "mtimeNs": stat_result.st_mtime_ns,
+        "sample": sample_fingerprint(file_path, stat_result.st_size),
+    }
+    header = read_model_header(file_path)
+    if header:
+        fingerprint["headerDigest"] = header["headerDigest"]
+    return fingerprint
+
+
+def fingerprint_status(file_path: Path, stored) -> str:
+    """Compare a file against its stored fingerprint without a full hash.
+
+    - ``unchanged``: size and mtime match
+    - ``touched``: mtime moved but size, header and sampled blocks match (e.g. a copy that reset mtime)
+    - ``changed``: the file was replaced or rewritten
+    - ``missing``: the sidecar predates fingerprints
+    """
+    if not isinstance(stored, dict):
+        return MISSING
+    try:
+        stat_result = file_path.stat()
+    except OSError:
+        return CHANGED
+    if stored.get("size") != stat_result.st_size:
+        return CHANGED
+    if stored.get("mtimeNs") == stat_result.st_mtime_ns:
+        return UNCHANGED
+    if stored.get("headerDigest"):
+        # The header holds tensor layout and training metadata, so a
+        # differing header settles it before any blocks are sampled.
+        header = read_model_header(file_path)
+        if header and header["headerDigest"] != stored["headerDigest"]:
+            return CHANGED
+    try:
+        sample = sample_fingerprint(file_path, stat_result.st_size)
+    except OSError:
+        return CHANGED
+    return TOUCHED if sample == stored.get("sample") else CHANGED
+
+
+def stored_fingerprint(sidecar: dict | None) -> dict | None:
+    if not sidecar:
+        return None
+    extensions = sidecar.get("extensions")
+    if not isinstance(extensions, dict):
+        return None
+    return extensions.get("fingerprint")
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+HASH_CACHE_VERSION = 1
+# ``save_if_due`` writes once this many entries changed or this long passed
+# since the last save, so an interrupted job keeps most of its hashes.
+AUTOSAVE_ENTRIES = 200
+AUTOSAVE_SECONDS = 60.0
+
+# One lock per cache file, shared by every job in this process.
+_SAVE_LOCKS: dict[str, threading.Lock] = {}
+_SAVE_LOCKS_GUARD = threading.Lock()
+
+
+class HashCache:
+    """Persistent SHA256 store keyed by resolved path and file identity.
+
+    An entry is only trusted while the file's size, ``st_mtime_ns`` and inode
+    still match what was recorded when the hash was computed.
+
+    Jobs running at the same time each hold their own instance. ``save``
+    merges this instance's changes into the file on disk instead of
+    rewriting it, so no job drops another job's new hashes.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        # Changes since the last save: keys stored, and stale entries removed.
+        self._stored: set[str] = set()
+        self._removed: dict[str, dict] = {}
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._entries = _read_entries(cache_path)
+
+    def lookup(self, file_path: Path, stat_result: os.stat_result | None = None) -> str | None:
+        key = _cache_key(file_path)
+        try:
+            stat_result = stat_result or file_path.stat()
+        except OSError:
+            stat_result = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and stat_result is not None and _matches(entry, stat_result):
+                self.hits += 1
+                return entry["sha256"]
+            if entry:
+                del self._entries[key]
+                self._stored.discard(key)
+                self._removed[key] = entry
+            self.misses += 1
+            return None
+
+    def contains(self, file_path: Path, stat_result: os.stat_result) -> bool:
+        """Check for a still-valid entry without touching hit/miss counters."""
+        return self.peek(file_path, stat_result) is not None
+
+    def peek(self, file_path: Path, stat_result: os.stat_result | None = None) -> str | None:
+        """Return a still-valid hash without touching counters or stale entries."""
+        try:
+            stat_result = stat_result or file_path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(_cache_key(file_path))
+            return entry["sha256"] if entry and _matches(entry, stat_result) else None
+
+    def store(self, file_path: Path, sha256_hash: str, stat_result: os.stat_result | None = None) -> None:
+        if not sha256_hash:
+            return
+        try:
+            stat_result = stat_result or file_path.stat()
+        except OSError:
+            return
+        key = _cache_key(file_path)
+        with self._lock:
+            self._entries[key] = {
+                "size": stat_result.st_size,
+                "mtimeNs": stat_result.st_mtime_ns,
+                "inode": stat_result.st_ino,
+                "sha256": sha256_hash.lower(),
+            }
+            self._stored.add(key)
+            self._removed.pop(key, None)
+
+    def save_if_due(self) -> None:
+        """Save when ``AUTOSAVE_ENTRIES`` changes or ``AUTOSAVE_SECONDS`` have piled up."""
+        with self._lock:
+            pending = len(self._stored) + len(self._removed)
+            due = pending >= AUTOSAVE_ENTRIES or (
+                pending and time.monotonic() - self._saved_at >= AUTOSAVE_SECONDS
+            )
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        """Merge this instance's changes into the file on disk.
+
+        Entries stored here win; entries removed here as stale are only
+        dropped if the file still holds that same entry. Hashes other jobs
+        saved meanwhile are picked up as well.
+        """
+        with _save_lock(self.cache_path):
+            with self._lock:
+                self._saved_at = time.monotonic()
+                if not self._stored and not self._removed:
+                    return
+                stored = {key: self._entries[key] for key in self._stored if key in self._entries}
+                removed, self._removed = self._removed, {}
+                self._stored = set()
+            entries = _read_entries(self.cache_path)
+            entries.update(stored)
+            for key, entry in removed.items():
+                if entries.get(key) == entry:
+                    del entries[key]
+            payload = {"version": HASH_CACHE_VERSION, "entries": entries}
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_suffix(f"{self.cache_path.suffix}.tmp")
+                tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+                tmp_path.replace(self.cache_path)
+            except OSError as exc:
+                print(f"Civitai updater: failed to save hash cache: {exc}")
+                with self._lock:
+                    # Keep the changes for the next attempt.
+                    self._stored.update(key for key in stored if key not in self._removed)
+                    for key, entry in removed.items():
+                        if key not in self._stored:
+                            self._removed.setdefault(key, entry)
+                return
+            with self._lock:
+                for key, entry in entries.items():
+                    if key not in self._stored and key not in self._removed:
+                        self._entries[key] = entry
+
+
+def _read_entries(cache_path: Path) -> dict[str, dict]:
+    if not cache_path.is_file():
+        return {}
+    try:
+        raw = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(raw, dict) or raw.get("version") != HASH_CACHE_VERSION:
+        return {}
+    entries = raw.get("entries")
+    if not isinstance(entries, dict):
+        return {}
+    return {
+        key: entry
+        for key, entry in entries.items()
+        if isinstance(entry, dict) and isinstance(entry.get("sha256"), str)
+    }
+
+
+def _save_lock(cache_path: Path) -> threading.Lock:
+    with _SAVE_LOCKS_GUARD:
+        return _SAVE_LOCKS.setdefault(str(cache_path), threading.Lock())
+
+
+def _cache_key(file_path: Path) -> str:
+    try:
+        resolved = file_path.resolve()
+    except OSError:
+        resolved = file_path
+    return os.path.normcase(str(resolved))
+
+
+def _matches(entry: dict, stat_result: os.stat_result) -> bool:
+    return (
+        entry.get("size") == stat_result.st_size
+        and entry.get("mtimeNs") == stat_result.st_mtime_ns
+        and entry.get("inode") == stat_result.st_ino
+    )
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import re
+
+from .hash_cache import HashCache
+
+_SHA256_RE = re.compile(r"^[0-9a-fA-F]{64}$")
+
+# A1111/Forge keep cache.json in the webui root, two levels above
+# models/Stable-diffusion, models/Lora, ...
+_A1111_CACHE_SEARCH_DEPTH = 3
+# Title prefixes A1111 uses in the ``hashes`` section, by our model type.
+_A1111_TITLE_PREFIXES = {
+    "checkpoint": "checkpoint",
+    "lora": "lora",
+    "embedding": "textual_inversion",
+}
+
+
+def import_external_hashes(files: list[dict], roots: dict[str, list[Path]], hash_cache: HashCache) -> int:
+    """Seed *hash_cache* with SHA256 values other tools already computed.
+
+    Sources, in order of preference:
+
+    - ``<model>.sha256`` / ``<model>.<ext>.sha256`` sidecars written after the model
+    - ComfyUI LoRA Manager style ``<model>.metadata.json`` (``sha256``, ``size``, ``modified``)
+    - A1111/Forge ``cache.json`` ``hashes`` section (``mtime``, ``sha256``)
+
+    An imported hash is only accepted when the source's recorded size and/or
+    mtime agree with the file on disk. Returns the number of files seeded.
+    """
+    a1111_indexes = _load_a1111_indexes(roots)
+    imported = 0
+    for entry in files:
+        file_path = entry["path"]
+        try:
+            stat_result = file_path.stat()
+        except OSError:
+            continue
+        if hash_cache.contains(file_path, stat_result):
+            continue
+        sha256_hash = (
+            _from_sha256_sidecar(file_path, stat_result)
+            or _from_metadata_json(file_path, stat_result)
+            or _from_a1111_index(a1111_indexes, entry, roots, stat_result)
+        )
+        if sha256_hash:
+            hash_cache.store(file_path, sha256_hash, stat_result)
+            imported += 1
+    return imported
+
+
+def _from_sha256_sidecar(file_path: Path, stat_result: os.stat_result) -> str | None:
+    for candidate in (file_path.with_suffix(".sha256"), Path(f"{file_path}.sha256")):
+        try:
+            if candidate.stat().st_mtime_ns < stat_result.st_mtime_ns:
+                continue
+            text = candidate.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            continue
+        # `sha256sum` output: "<hash>  <filename>"
+        token = text.strip().split(maxsplit=1)[0] if text.strip() else ""
+        if _SHA256_RE.match(token):
+            return token.lower()
+    return None
+
+
+def _from_metadata_json(file_path: Path, stat_result: os.stat_result) -> str | None:
+    candidate = file_path.with_suffix(".metadata.json")
+    if not candidate.is_file():
+        return None
+    try:
+        data = json.loads(candidate.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    sha256_hash = data.get("sha256")
+    if not isinstance(sha256_hash, str) or not _SHA256_RE.match(sha256_hash):
+        return None
+    size = data.get("size", data.get("file_size"))
+    if size is None or not _same_number(size, stat_result.st_size, tolerance=0):
+        return None
+    modified = data.get("modified")
+    if modified is not None and not _same_number(modified, stat_result.st_mtime, tolerance=1.0):
+        return None
+    return sha256_hash.lower()
+
+
+def _from_a1111_index(
+    indexes: dict[Path, dict[str, list[tuple[float, str, int | None]]]],
+    entry: dict,
+    roots: dict[str, list[Path]],
+    stat_result: os.stat_result,
+) -> str | None:
+    """Look *entry* up by its full ``<type>/<relative name>`` title.
+
+    Only the cache.json found above the file's own model root is consulted,
+    so same-named files in other roots cannot match. Checkpoints are titled
+    with their path below the model folder including the extension, LoRAs
+    and embeddings without it.
+    """
+    prefix = _A1111_TITLE_PREFIXES.get(entry.get("modelType", ""))
+    if prefix is None:
+        return None
+    file_path = entry["path"]
+    for root in roots.get(entry["modelType"], []):
+        try:
+            relative = file_path.relative_to(root).as_posix()
+        except ValueError:
+            continue
+        if prefix != "checkpoint":
+            relative = relative[: -len(file_path.suffix)] if file_path.suffix else relative
+        for mtime, sha256_hash, size in indexes.get(root, {}).get(f"{prefix}/{relative}".lower(), ()):
+            # A1111 records no size; one written by another tool must match.
+            if size is not None and size != stat_result.st_size:
+                continue
+            if _same_number(mtime, stat_result.st_mtime, tolerance=0.001):
+                return sha256_hash
+        return None
+    return None
+
+
+def _load_a1111_indexes(roots: dict[str, list[Path]]) -> dict[Path, dict[str, list[tuple[float, str, int | None]]]]:
+    """Index the full-file hashes of the A1111 cache.json above each model root by title.
+
+    Titles look like ``checkpoint/sub/name.safetensors`` or ``lora/name``.
+    Only the ``hashes`` section is read: ``hashes-addnet`` (where A1111 keeps
+    safetensors LoRAs) holds hashes of the tensor data without the header,
+    not of the file.
+    """
+    parsed: dict[Path, dict] = {}
+    indexes: dict[Path, dict[str, list[tuple[float, str, int | None]]]] = {}
+    for model_roots in roots.values():
+        for root in model_roots:
+            directory = root
+            for _ in range(_A1111_CACHE_SEARCH_DEPTH):
+                candidate = directory / "cache.json"
+                if candidate not in parsed and candidate.is_file():
+                    parsed[candidate] = _read_a1111_hashes(candidate)
+                if candidate in parsed:
+                    indexes[root] = parsed[candidate]
+                    break
+                if directory.parent == directory:
+                    break
+                directory = directory.parent
+    return indexes
+
+
+def _read_a1111_hashes(cache_file: Path) -> dict[str, list[tuple[float, str, int | None]]]:
+    index: dict[str, list[tuple[float, str, int | None]]] = {}
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return index
+    section = data.get("hashes") if isinstance(data, dict) else None
+    if not isinstance(section, dict):
+        return index
+    for title, record in section.items():
+        if not isinstance(record, dict):
+            continue
+        sha256_hash = record.get("sha256")
+        mtime = record.get("mtime")
+        if not isinstance(sha256_hash, str) or not _SHA256_RE.match(sha256_hash):
+            continue
+        if not isinstance(mtime, (int, float)):
+            continue
+        size = record.get("size")
+        key = str(title).replace("\\", "/").lower()
+        index.setdefault(key, []).append(
+            (float(mtime), sha256_hash.lower(), size if isinstance(size, int) else None)
+        )
+    return index
+
+
+def _same_number(value, expected: float, tolerance: float) -> bool:
+    try:
+        return abs(float(value) - float(expected)) <= tolerance
+    except (TypeError, ValueError):
+        return False
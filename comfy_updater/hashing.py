@@ -1,16 +1,177 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import hashlib
+import os
 from pathlib import Path
+import threading
+from typing import Callable
 
 
-def sha256_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+class HashingCancelled(Exception):
+    """Raised from inside a hash when the owning job is cancelled."""
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(
+    file_path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    control=None,
+    drop_cache: bool = False,
+    on_bytes: Callable[[int], None] | None = None,
+) -> str:
+    """Hash a file with a single reused buffer.
+
+    *on_bytes* is called with the size of every chunk as it is hashed.
+
+    With *drop_cache* the pages just read are released via
+    ``posix_fadvise(DONTNEED)`` so hashing large checkpoints does not push the
+    files ComfyUI is actively using out of the page cache.
+    """
     digest = hashlib.sha256()
-    with file_path.open("rb") as handle:
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    advise = drop_cache and hasattr(os, "posix_fadvise")
+    with file_path.open("rb", buffering=0) as handle:
+        fd = handle.fileno()
+        if advise:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        offset = 0
         while True:
-            chunk = handle.read(chunk_size)
-            if not chunk:
+            if control:
+                control.wait_if_paused()
+                if control.is_cancelled():
+                    raise HashingCancelled(str(file_path))
+            read = handle.readinto(buffer)
+            if not read:
                 break
-            digest.update(chunk)
+            digest.update(view[:read])
+            if advise:
+                os.posix_fadvise(fd, offset, read, os.POSIX_FADV_DONTNEED)
+            offset += read
+            if on_bytes:
+                on_bytes(read)
     return digest.hexdigest()
 
+
+def sample_fingerprint(
+    file_path: Path,
+    size: int | None = None,
+    samples: int = 8,
+    block_size: int = 64 * 1024,
+) -> str:
+    """Cheap content fingerprint: file size plus blocks read at fixed, evenly spaced offsets.
+
+    Reads at most ``samples * block_size`` bytes regardless of file size (the
+    whole file when it is smaller than that), including the first and last
+    block so header and tail edits are caught.
+    """
+    if size is None:
+        size = file_path.stat().st_size
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with file_path.open("rb") as handle:
+        if size <= samples * block_size:
+            digest.update(handle.read())
+        else:
+            span = size - block_size
+            for index in range(samples):
+                handle.seek(span * index // (samples - 1))
+                digest.update(handle.read(block_size))
+    return digest.hexdigest()[:32]
+
+
+class HashPool:
+    """Bounded worker pool that hashes files ahead of the sequential job loop.
+
+    hashlib releases the GIL while digesting, so a handful of threads keeps
+    several disks and cores busy. Each *key* (the path, or a shared content
+    key for linked/copied duplicates) is hashed at most once per pool; callers
+    ask for results in whatever order they process files.
+
+    Work is queued per ``st_dev`` and ``device_limit`` caps how many hashes
+    run against one device at a time, so a spinning disk is read by a single
+    worker while NVMe and network mounts take several.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        hash_fn: Callable[[Path], str],
+        device_limit: Callable[[int], int] | None = None,
+    ):
+        self.workers = max(1, int(workers))
+        self._hash_fn = hash_fn
+        self._device_limit = device_limit or (lambda device: self.workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="civitai-updater-hash",
+        )
+        self._futures: dict[str, Future] = {}
+        self._pending: dict[int, deque[tuple[Path, Future]]] = {}
+        self._running: dict[int, int] = {}
+        self._running_total = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: Path, device: int | None = None, key: str | None = None) -> Future:
+        key = key or str(file_path)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future
+            if device is None:
+                try:
+                    device = file_path.stat().st_dev
+                except OSError:
+                    device = -1
+            future = Future()
+            self._futures[key] = future
+            self._pending.setdefault(device, deque()).append((file_path, future))
+            self._dispatch_locked()
+            return future
+
+    def result(self, file_path: Path, key: str | None = None) -> str:
+        return self.submit(file_path, key=key).result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            for queue in self._pending.values():
+                for _, future in queue:
+                    future.cancel()
+            self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch_locked(self) -> None:
+        if self._closed:
+            return
+        progressed = True
+        while progressed and self._running_total < self.workers:
+            progressed = False
+            for device, queue in self._pending.items():
+                if not queue or self._running.get(device, 0) >= self._device_limit(device):
+                    continue
+                file_path, future = queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    progressed = True
+                    continue
+                self._running[device] = self._running.get(device, 0) + 1
+                self._running_total += 1
+                self._executor.submit(self._run_one, device, file_path, future)
+                progressed = True
+                if self._running_total >= self.workers:
+                    break
+
+    def _run_one(self, device: int, file_path: Path, future: Future) -> None:
+        try:
+            future.set_result(self._hash_fn(file_path))
+        except BaseException as exc:  # noqa: BLE001 - surfaced through the future
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._running[device] -= 1
+                self._running_total -= 1
+                self._dispatch_locked()
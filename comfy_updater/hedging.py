@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from functools import partial
+import math
+import threading
+from typing import Callable
+
+# Latencies kept for the percentile; old samples age out so the threshold
+# follows the link as it gets faster or slower.
+LATENCY_WINDOW = 200
+# No hedging until this many requests have been observed.
+MIN_LATENCY_SAMPLES = 20
+_STARTED_POLL_SECONDS = 0.5
+
+
+class Hedger:
+    """Duplicates a request that runs past a percentile of recent latency.
+
+    ``run(send)`` calls ``send(started)``; *send* sets the *started* event
+    once the request is on the wire, so time spent waiting for the rate
+    limiter does not count. If no answer arrives within the
+    ``percentile``-th latency of the last ``LATENCY_WINDOW`` requests, a
+    second ``send`` is started and whichever returns a response first wins.
+    The slower one is left to finish in the background and its answer is
+    dropped. A percentile of 0 disables hedging.
+
+    Half of ``max_workers`` is for the callers' own requests and half for
+    hedges: while that many hedged pairs are still running, slow requests
+    are simply waited for, so stragglers never hold the slots primaries need.
+    """
+
+    def __init__(self, percentile: int, max_workers: int):
+        self.percentile = max(0, min(99, int(percentile)))
+        self.max_workers = max(2, int(max_workers))
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self._samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Hedged pairs with a request still running, winner or not.
+        self._hedges_in_flight = 0
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.percentile > 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def delay(self) -> float | None:
+        """Seconds after which a request is hedged, or None while not hedging."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if len(self._samples) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def run(self, send: Callable[[threading.Event], object]):
+        with self._lock:
+            self.requests += 1
+        delay = self.delay()
+        if delay is None:
+            return send(threading.Event())
+
+        pool = self._executor()
+        started = threading.Event()
+        primary = pool.submit(send, started)
+        while not started.wait(_STARTED_POLL_SECONDS):
+            if primary.done():
+                return primary.result()
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        with self._lock:
+            if self._hedges_in_flight >= self.max_workers // 2:
+                hedge = False
+            else:
+                hedge = True
+                self.hedged += 1
+                self._hedges_in_flight += 1
+        if not hedge:
+            return primary.result()
+        backup = pool.submit(send, threading.Event())
+        pair = [primary, backup]
+        for future in pair:
+            future.add_done_callback(partial(self._pair_done, pair))
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    if future is backup:
+                        with self._lock:
+                            self.wins += 1
+                    return result
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hedgedRequests": self.hedged,
+                "hedgeWins": self.wins,
+                "hedgeRate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+                "hedgeWinRate": round(self.wins / self.hedged, 3) if self.hedged else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _pair_done(self, pair: list, _future) -> None:
+        with self._lock:
+            # Both callbacks can see the pair finished; count it once.
+            if pair and all(future.done() for future in pair):
+                pair.clear()
+                self._hedges_in_flight -= 1
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="civitai-hedge")
+            return self._pool
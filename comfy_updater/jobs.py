@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import threading
 import time
+from typing import Callable
 import uuid
 
 
@@ -36,6 +37,7 @@ class JobRecord:
             "itemCount": len(self.items),
             "errors": self.errors,
         }
+        payload.update(self.control.metrics.snapshot() if self.control else JobMetrics().snapshot())
         if include_items:
             payload["items"] = self.items
         return payload
@@ -303,6 +305,7 @@ def _group_items_by_model(items: list[dict]) -> list[dict]:
                 "modelPath": m.get("modelPath", ""),
                 "previewUrl": m.get("localPreviewUrl", ""),
                 "previewType": m.get("localPreviewType", "image"),
+                "previewFileUrl": m.get("previewFileUrl", ""),
             })
             if latest_id and local_vid == latest_id:
                 has_latest_locally = True
@@ -340,6 +343,7 @@ def _group_items_by_model(items: list[dict]) -> list[dict]:
                 "modelPath": item.get("modelPath", ""),
                 "previewUrl": item.get("localPreviewUrl", ""),
                 "previewType": item.get("localPreviewType", "image"),
+                "previewFileUrl": item.get("previewFileUrl", ""),
             }],
             "latestVersionId": str(item.get("latestVersionId") or ""),
             "latestVersionName": item.get("latestVersionName", ""),
@@ -379,10 +383,67 @@ def _filename(path: str) -> str:
     return path[i + 1:] if i >= 0 else path
 
 
+class JobMetrics:
+    """Live byte counters a running job reports next to its file progress.
+
+    Hash workers add bytes as they read; the totals only cover files that
+    actually need hashing, so the ETA is weighted by bytes rather than files.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bytes_total = 0
+        self._bytes_done = 0
+        self._first_byte_at: float | None = None
+        self._last_byte_at: float | None = None
+        self._sections: dict[str, Callable[[], dict]] = {}
+
+    def add_bytes_total(self, count: int) -> None:
+        with self._lock:
+            self._bytes_total = max(0, self._bytes_total + int(count))
+
+    def add_bytes(self, count: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._first_byte_at is None:
+                self._first_byte_at = now
+            self._last_byte_at = now
+            self._bytes_done += int(count)
+
+    def register_section(self, name: str, provider: Callable[[], dict]) -> None:
+        """Report ``provider()`` under *name* in every snapshot (e.g. network state)."""
+        with self._lock:
+            self._sections[name] = provider
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sections = dict(self._sections)
+            total = max(self._bytes_total, self._bytes_done)
+            done = self._bytes_done
+            throughput = 0.0
+            if self._first_byte_at is not None and self._last_byte_at is not None:
+                elapsed = self._last_byte_at - self._first_byte_at
+                if elapsed > 0:
+                    throughput = done / elapsed
+        eta = None
+        if throughput > 0:
+            eta = round((total - done) / throughput, 1)
+        payload = {
+            "bytesTotal": total,
+            "bytesDone": done,
+            "throughputMBps": round(throughput / 1_000_000, 1),
+            "etaSeconds": eta,
+        }
+        for name, provider in sections.items():
+            payload[name] = provider()
+        return payload
+
+
 class JobControl:
     def __init__(self) -> None:
         self._cancel_event = threading.Event()
         self._pause_event = threading.Event()
+        self.metrics = JobMetrics()
 
     def cancel(self) -> None:
         self._cancel_event.set()
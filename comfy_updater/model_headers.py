@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import struct
+
+# Headers above this are treated as corrupt rather than read into memory.
+MAX_SAFETENSORS_HEADER_BYTES = 64 * 1024 * 1024
+MAX_GGUF_METADATA_BYTES = 16 * 1024 * 1024
+MAX_GGUF_KV_COUNT = 4096
+
+_GGUF_SCALAR_FORMATS = {
+    0: "<B",
+    1: "<b",
+    2: "<H",
+    3: "<h",
+    4: "<I",
+    5: "<i",
+    6: "<f",
+    7: "<?",
+    10: "<Q",
+    11: "<q",
+    12: "<d",
+}
+_GGUF_STRING = 8
+_GGUF_ARRAY = 9
+
+# Substring of a header architecture/base-model hint -> Civitai baseModel.
+# Checked in order, so more specific patterns come first.
+_BASE_MODEL_HINTS = (
+    ("flux-1-schnell", "Flux.1 S"),
+    ("flux_schnell", "Flux.1 S"),
+    ("flux", "Flux.1 D"),
+    ("sdxl", "SDXL 1.0"),
+    ("stable-diffusion-xl", "SDXL 1.0"),
+    ("sd3.5", "SD 3.5"),
+    ("sd3", "SD 3"),
+    ("stable-diffusion-v3", "SD 3"),
+    ("pony", "Pony"),
+    ("sd_v2", "SD 2.1"),
+    ("stable-diffusion-v2", "SD 2.1"),
+    ("sd_v1", "SD 1.5"),
+    ("stable-diffusion-v1", "SD 1.5"),
+    ("wan", "Wan Video"),
+    ("hunyuan", "Hunyuan Video"),
+    ("ltxv", "LTXV"),
+)
+
+
+def read_model_header(file_path: Path) -> dict | None:
+    """Read identification metadata from a model's header only (a few KB).
+
+    Returns ``{"format", "headerDigest", "name", "architecture", "baseModel",
+    "embeddedHashes"}`` for ``.safetensors``/``.sft`` and ``.gguf`` files,
+    or None for other formats or unreadable headers. ``headerDigest`` is a
+    SHA256 of the raw header bytes, which differ between files that carry
+    different metadata or tensor layouts.
+    """
+    suffix = file_path.suffix.lower()
+    try:
+        if suffix in (".safetensors", ".sft"):
+            return _read_safetensors_header(file_path)
+        if suffix == ".gguf":
+            return _read_gguf_header(file_path)
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+    return None
+
+
+def _read_safetensors_header(file_path: Path) -> dict | None:
+    with file_path.open("rb") as handle:
+        prefix = handle.read(8)
+        if len(prefix) != 8:
+            return None
+        (header_size,) = struct.unpack("<Q", prefix)
+        if header_size <= 0 or header_size > MAX_SAFETENSORS_HEADER_BYTES:
+            return None
+        raw = handle.read(header_size)
+    if len(raw) != header_size:
+        return None
+    header = json.loads(raw.decode("utf-8"))
+    if not isinstance(header, dict):
+        return None
+    metadata = header.get("__metadata__")
+    if not isinstance(metadata, dict):
+        metadata = {}
+
+    name = _first_str(metadata, ("modelspec.title", "ss_output_name", "name"))
+    architecture = _first_str(metadata, ("modelspec.architecture", "ss_base_model_version", "ss_network_module"))
+    hints = [
+        _first_str(metadata, ("modelspec.architecture",)),
+        _first_str(metadata, ("ss_base_model_version",)),
+        _first_str(metadata, ("ss_sd_model_name",)),
+    ]
+    # Trainer-embedded (kohya) hashes cover tensor data only, not the whole
+    # file, so they are reported as-is rather than used as the file SHA256.
+    embedded = {}
+    for key in ("sshs_model_hash", "sshs_legacy_hash"):
+        value = metadata.get(key)
+        if isinstance(value, str) and value:
+            embedded[key] = value.lower()
+    return {
+        "format": "safetensors",
+        "headerDigest": hashlib.sha256(raw).hexdigest()[:32],
+        "name": name,
+        "architecture": architecture,
+        "baseModel": _guess_base_model(hints),
+        "embeddedHashes": embedded,
+    }
+
+
+def _read_gguf_header(file_path: Path) -> dict | None:
+    with file_path.open("rb") as handle:
+        reader = _LimitedReader(handle, MAX_GGUF_METADATA_BYTES)
+        if reader.read(4) != b"GGUF":
+            return None
+        (version,) = struct.unpack("<I", reader.read(4))
+        if version < 2:
+            return None
+        _tensor_count, kv_count = struct.unpack("<QQ", reader.read(16))
+        if kv_count > MAX_GGUF_KV_COUNT:
+            return None
+        metadata: dict[str, object] = {}
+        for _ in range(kv_count):
+            key = _gguf_string(reader)
+            (value_type,) = struct.unpack("<I", reader.read(4))
+            value = _gguf_value(reader, value_type)
+            if value is not None:
+                metadata[key] = value
+
+    name = _first_str(metadata, ("general.name", "general.basename"))
+    architecture = _first_str(metadata, ("general.architecture",))
+    return {
+        "format": "gguf",
+        "headerDigest": reader.digest.hexdigest()[:32],
+        "name": name,
+        "architecture": architecture,
+        "baseModel": _guess_base_model([architecture, name]),
+        "embeddedHashes": {},
+    }
+
+
+class _LimitedReader:
+    def __init__(self, handle, limit: int):
+        self._handle = handle
+        self._limit = limit
+        self._read = 0
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int) -> bytes:
+        if size < 0 or self._read + size > self._limit:
+            raise ValueError("GGUF metadata exceeds the read limit")
+        data = self._handle.read(size)
+        if len(data) != size:
+            raise ValueError("truncated GGUF metadata")
+        self._read += size
+        self.digest.update(data)
+        return data
+
+
+def _gguf_string(reader: _LimitedReader) -> str:
+    (length,) = struct.unpack("<Q", reader.read(8))
+    return reader.read(length).decode("utf-8", errors="replace")
+
+
+def _gguf_value(reader: _LimitedReader, value_type: int):
+    """Read one GGUF metadata value; arrays are consumed but not kept."""
+    if value_type == _GGUF_STRING:
+        return _gguf_string(reader)
+    if value_type == _GGUF_ARRAY:
+        (item_type,) = struct.unpack("<I", reader.read(4))
+        (count,) = struct.unpack("<Q", reader.read(8))
+        if item_type in _GGUF_SCALAR_FORMATS:
+            reader.read(struct.calcsize(_GGUF_SCALAR_FORMATS[item_type]) * count)
+        else:
+            for _ in range(count):
+                _gguf_value(reader, item_type)
+        return None
+    fmt = _GGUF_SCALAR_FORMATS.get(value_type)
+    if fmt is None:
+        raise ValueError(f"unknown GGUF value type {value_type}")
+    (value,) = struct.unpack(fmt, reader.read(struct.calcsize(fmt)))
+    return value
+
+
+def _first_str(metadata: dict, keys: tuple[str, ...]) -> str:
+    for key in keys:
+        value = metadata.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+def _guess_base_model(hints: list[str]) -> str:
+    for hint in hints:
+        lowered = (hint or "").lower()
+        if not lowered:
+            continue
+        for pattern, base_model in _BASE_MODEL_HINTS:
+            if pattern in lowered:
+                return base_model
+    return ""
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import threading
+import time
+
+NEGATIVE_CACHE_VERSION = 1
+# ``save_if_due`` writes once this many records are new or this long passed
+# since the last save.
+AUTOSAVE_ENTRIES = 50
+AUTOSAVE_SECONDS = 60.0
+
+# One lock per cache file, shared by every job in this process.
+_SAVE_LOCKS: dict[str, threading.Lock] = {}
+_SAVE_LOCKS_GUARD = threading.Lock()
+
+
+class NegativeCache:
+    """Persistent record of SHA256 values Civitai answered with "not found".
+
+    Private merges and self-trained files never resolve, so for
+    ``ttl_seconds`` after a 404 their hashes are answered locally. A TTL of 0
+    disables the cache (nothing is recorded or served). With *refresh*
+    nothing is served but new answers are still recorded. ``save`` merges
+    new records into the file on disk, keeping the newest answer per hash,
+    so overlapping jobs keep each other's records.
+    """
+
+    def __init__(self, cache_path: Path, ttl_seconds: int, refresh: bool = False):
+        self.cache_path = cache_path
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.refresh = refresh
+        self.hits = 0
+        # Records made since the last save.
+        self._recorded: set[str] = set()
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._entries = _read_entries(cache_path)
+
+    def contains(self, sha256_hash: str) -> bool:
+        """Check for a still-fresh not-found record without counting a hit."""
+        if self.refresh or not self.ttl_seconds or not sha256_hash:
+            return False
+        with self._lock:
+            checked_at = self._entries.get(sha256_hash.lower())
+        return checked_at is not None and time.time() - checked_at < self.ttl_seconds
+
+    def lookup(self, sha256_hash: str) -> bool:
+        if not self.contains(sha256_hash):
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def record(self, sha256_hash: str) -> None:
+        if not self.ttl_seconds or not sha256_hash:
+            return
+        with self._lock:
+            self._entries[sha256_hash.lower()] = time.time()
+            self._recorded.add(sha256_hash.lower())
+
+    def save_if_due(self) -> None:
+        """Save when ``AUTOSAVE_ENTRIES`` records or ``AUTOSAVE_SECONDS`` have piled up."""
+        with self._lock:
+            pending = len(self._recorded)
+            due = pending >= AUTOSAVE_ENTRIES or (
+                pending and time.monotonic() - self._saved_at >= AUTOSAVE_SECONDS
+            )
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        """Merge new records into the file on disk; the newest answer per hash wins."""
+        with _save_lock(self.cache_path):
+            with self._lock:
+                self._saved_at = time.monotonic()
+                if not self._recorded:
+                    return
+                recorded = {key: self._entries[key] for key in self._recorded}
+                self._recorded = set()
+            now = time.time()
+            entries = _read_entries(self.cache_path)
+            for key, checked_at in recorded.items():
+                entries[key] = max(checked_at, entries.get(key, 0.0))
+            # Expired records only matter until the next lookup; drop them.
+            entries = {
+                key: checked_at for key, checked_at in entries.items() if now - checked_at < self.ttl_seconds
+            }
+            payload = {"version": NEGATIVE_CACHE_VERSION, "entries": entries}
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_suffix(f"{self.cache_path.suffix}.tmp")
+                tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+                tmp_path.replace(self.cache_path)
+            except OSError as exc:
+                print(f"Civitai updater: failed to save not-found cache: {exc}")
+                with self._lock:
+                    self._recorded.update(recorded)  # retried on the next save
+                return
+            with self._lock:
+                for key, checked_at in entries.items():
+                    if checked_at > self._entries.get(key, 0.0):
+                        self._entries[key] = checked_at
+
+
+def _read_entries(cache_path: Path) -> dict[str, float]:
+    if not cache_path.is_file():
+        return {}
+    try:
+        raw = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(raw, dict) or raw.get("version") != NEGATIVE_CACHE_VERSION:
+        return {}
+    entries = raw.get("entries")
+    if not isinstance(entries, dict):
+        return {}
+    return {key: float(checked_at) for key, checked_at in entries.items() if isinstance(checked_at, (int, float))}
+
+
+def _save_lock(cache_path: Path) -> threading.Lock:
+    with _SAVE_LOCKS_GUARD:
+        return _SAVE_LOCKS.setdefault(str(cache_path), threading.Lock())
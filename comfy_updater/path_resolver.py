@@ -65,6 +65,28 @@ def list_model_files(roots: dict[str, list[Path]]) -> list[dict]:
     return files
 
 
+def group_model_files_by_device(files: list[dict]) -> dict[int, list[dict]]:
+    """Group `list_model_files` entries by ``st_dev``.
+
+    Each entry is annotated with ``device``, ``inode`` and ``size``; files that
+    cannot be stat'ed land under device ``-1``.
+    """
+    groups: dict[int, list[dict]] = {}
+    for entry in files:
+        try:
+            stat_result = entry["path"].stat()
+        except OSError:
+            entry.update({"device": -1, "inode": 0, "size": 0})
+        else:
+            entry.update({
+                "device": stat_result.st_dev,
+                "inode": stat_result.st_ino,
+                "size": stat_result.st_size,
+            })
+        groups.setdefault(entry["device"], []).append(entry)
+    return groups
+
+
 def normalize_model_types(raw_types: list[str] | None) -> list[str]:
     if not raw_types:
         return list(SUPPORTED_MODEL_TYPES)
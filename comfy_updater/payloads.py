@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+# Version fields the update check reads; everything else in a /models/{id}
+# payload (other versions, image metadata, file lists, stats) is dropped.
+_VERSION_FIELDS = ("id", "name", "baseModel", "publishedAt", "createdAt", "downloadUrl")
+
+
+def compact_model(model: dict | None) -> dict | None:
+    """Project a raw ``/models/{id}`` payload down to what the updater uses.
+
+    The result keeps the raw payload's shape (``id``, ``name``, ``type``,
+    ``creator.username`` and ``modelVersions[0]`` with its first image and
+    first video), so projecting it again is a no-op and it can be cached in
+    place of the raw JSON.
+    """
+    if not isinstance(model, dict):
+        return None
+    compact = {key: model[key] for key in ("id", "name", "type") if key in model}
+    creator = model.get("creator")
+    if isinstance(creator, dict):
+        compact["creator"] = {"username": creator.get("username") or ""}
+    versions = model.get("modelVersions") or []
+    if versions and isinstance(versions[0], dict):
+        compact["modelVersions"] = [_compact_version(versions[0])]
+    else:
+        compact["modelVersions"] = []
+    return compact
+
+
+def _compact_version(version: dict) -> dict:
+    compact = {key: version[key] for key in _VERSION_FIELDS if key in version}
+    if not compact.get("downloadUrl"):
+        for file_info in version.get("files") or []:
+            url = file_info.get("downloadUrl") if isinstance(file_info, dict) else None
+            if isinstance(url, str) and url:
+                compact["files"] = [{"downloadUrl": url}]
+                break
+    images = []
+    for preferred in ("image", "video"):
+        for entry in version.get("images") or []:
+            if isinstance(entry, dict) and entry.get("type") == preferred and entry.get("url"):
+                images.append({"type": preferred, "url": entry["url"]})
+                break
+    compact["images"] = images
+    return compact
+
+
+class LatestVersion:
+    """The primary version of a model, as the update check needs it."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "base_model",
+        "date",
+        "download_url",
+        "preview_url",
+        "preview_type",
+        "creator_name",
+    )
+
+    def __init__(
+        self,
+        id=None,
+        name: str = "",
+        base_model: str = "",
+        date: str = "",
+        download_url: str = "",
+        preview_url: str = "",
+        preview_type: str = "image",
+        creator_name: str = "",
+    ):
+        self.id = id
+        self.name = name
+        self.base_model = base_model
+        self.date = date
+        self.download_url = download_url
+        self.preview_url = preview_url
+        self.preview_type = preview_type
+        self.creator_name = creator_name
+
+    @classmethod
+    def from_model(cls, model: dict | None) -> LatestVersion | None:
+        """Build from a raw or compacted model payload; None when it has no versions.
+
+        Civitai orders ``modelVersions`` by the creator's chosen index, so the
+        first entry is the primary version (not necessarily the newest).
+        """
+        compact = compact_model(model)
+        if not compact or not compact["modelVersions"]:
+            return None
+        version = compact["modelVersions"][0]
+        download_url = version.get("downloadUrl") or ""
+        if not download_url and version.get("files"):
+            download_url = version["files"][0]["downloadUrl"]
+        preview = version["images"][0] if version["images"] else {}
+        return cls(
+            id=version.get("id"),
+            name=version.get("name") or "",
+            base_model=version.get("baseModel") or "",
+            date=version.get("publishedAt") or version.get("createdAt") or "",
+            download_url=download_url,
+            preview_url=preview.get("url", ""),
+            preview_type=preview.get("type", "image"),
+            creator_name=(compact.get("creator") or {}).get("username", ""),
+        )
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from .client_provider import CivitaiClientProvider
 from .config_store import ConfigStore
 from .jobs import JobManager
 from .routes import register_routes
@@ -19,7 +20,9 @@ def initialize_plugin() -> None:
     data_dir = root_dir / ".civitai_updater"
 
     config_store = ConfigStore(data_dir)
-    updater_service = UpdaterService(config_store)
+    # One Civitai session for the life of the process, so jobs start on warm
+    # connections; it is rebuilt only when the network settings change.
+    updater_service = UpdaterService(config_store, CivitaiClientProvider())
     job_manager = JobManager()
     register_routes(config_store, updater_service, job_manager)
 
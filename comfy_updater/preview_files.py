@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import time
+from urllib.parse import urlencode
+
+from .sidecar import preview_sidecar_path
+from .thumbnails import write_thumbnail
+
+PREVIEW_ROUTE = "/civitai-updater/preview"
+# Requested sizes are rounded up to one of these, so the variant cache stays small.
+VARIANT_SIZES = (64, 128, 256, 512, 1024, 2048)
+# Variants unused this long are deleted by ``prune_variants``.
+MAX_VARIANT_AGE_SECONDS = 30 * 24 * 3600
+
+_CONTENT_TYPES = {".png": "image/png", ".webp": "image/webp"}
+
+
+def preview_file_url(model_path: Path, expected: bool = False) -> str:
+    """Local preview URL for *model_path*, or "" when it has no preview sidecar.
+
+    An existing sidecar's mtime is added as ``v`` so the URL changes with
+    the file and can be cached for good. With *expected* the URL is returned
+    for a preview that is still queued; it is then revalidated on every use.
+    """
+    source = local_preview_source(model_path)
+    if source is None and not expected:
+        return ""
+    query = {"path": str(model_path)}
+    if source is not None:
+        query["v"] = format(source.stat().st_mtime_ns, "x")
+    return f"{PREVIEW_ROUTE}?{urlencode(query)}"
+
+
+def local_preview_source(model_path: Path) -> Path | None:
+    """The sidecar to serve for *model_path*: the WebP copy if present, else the PNG."""
+    png_path = preview_sidecar_path(model_path)
+    for candidate in (png_path.with_suffix(".webp"), png_path):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def find_preview(raw_path: str, roots: dict[str, list[str]]) -> Path | None:
+    """Resolve a requested model path to its preview sidecar.
+
+    The path must lie inside one of the effective model *roots*; ``..``
+    segments are collapsed before the check, so nothing outside them can be
+    read.
+    """
+    if not raw_path or "\0" in raw_path:
+        return None
+    model_path = Path(os.path.abspath(raw_path))
+    for root_paths in roots.values():
+        for root in root_paths:
+            if model_path.is_relative_to(os.path.abspath(root)):
+                return local_preview_source(model_path)
+    return None
+
+
+def preview_variant(source: Path, size: int, cache_dir: Path) -> Path:
+    """*source* scaled to fit *size*, cached under *cache_dir*; *source* itself if it cannot be resized."""
+    size = variant_size(size)
+    stat = source.stat()
+    key = hashlib.sha1(f"{source}|{stat.st_mtime_ns}|{stat.st_size}|{size}".encode("utf-8")).hexdigest()
+    variant = cache_dir / f"{key}.webp"
+    if variant.is_file():
+        try:
+            variant.touch()  # keeps variants in use out of ``prune_variants``
+        except OSError:
+            pass
+        return variant
+    if write_thumbnail(source, variant, size):
+        return variant
+    return source
+
+
+def variant_size(size: int) -> int:
+    """Round a requested size up to one of ``VARIANT_SIZES``."""
+    return next((bucket for bucket in VARIANT_SIZES if bucket >= size), VARIANT_SIZES[-1])
+
+
+def preview_etag(source: Path, size: int = 0) -> str:
+    """Strong validator for *source* served at *size* (0 = as stored)."""
+    stat = source.stat()
+    suffix = f"-{variant_size(size)}" if size else ""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"'
+
+
+def prune_variants(cache_dir: Path, max_age_seconds: int = MAX_VARIANT_AGE_SECONDS) -> int:
+    """Delete resized variants older than *max_age_seconds* (mostly ones of replaced previews)."""
+    if not cache_dir.is_dir():
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in cache_dir.glob("*.webp"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def content_type(path: Path) -> str:
+    return _CONTENT_TYPES.get(path.suffix.lower(), "application/octet-stream")
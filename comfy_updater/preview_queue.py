@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import threading
+
+from .rate_limit import TokenBucket
+from .sidecar import preview_sidecar_path
+
+
+class PreviewQueue:
+    """Background writer for ``.preview.png`` (and ``.preview.webp``) sidecars.
+
+    Items queue previews and move on; ``workers`` threads download and
+    convert them behind a token bucket of their own, so preview traffic
+    neither slows the item loop nor eats into the API request budget.
+    Requests are deduplicated by target path while queued or running.
+    """
+
+    def __init__(
+        self,
+        client,
+        workers: int,
+        requests_per_second: float = 0.0,
+        max_dimension: int = 0,
+        control=None,
+    ):
+        self.client = client
+        self.control = control
+        self.max_dimension = max(0, int(max_dimension))
+        self.workers = max(1, int(workers))
+        self.written = 0
+        self.failed = 0
+        self._bucket = TokenBucket(requests_per_second, burst=self.workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="civitai-preview")
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, model_path: Path, preview_url: str, preview_type: str, force: bool = False) -> bool:
+        """Queue a preview for *model_path*; False when it exists or is already queued."""
+        if not preview_url:
+            return False
+        target_path = preview_sidecar_path(model_path)
+        if not force and target_path.exists():
+            return False
+        key = str(target_path)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = self._pool.submit(self._write, target_path, preview_url, preview_type)
+        return True
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def wait(self, timeout: float) -> int:
+        """Wait up to *timeout* seconds for the oldest pending preview; returns what is left."""
+        with self._lock:
+            future = next(iter(self._pending.values()), None)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:  # noqa: BLE001 - failures are counted by the worker
+                pass
+        return self.pending
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"queued": len(self._pending), "written": self.written, "failed": self.failed}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"previewsWritten": self.written, "previewsFailed": self.failed}
+
+    def close(self) -> None:
+        """Drop previews that have not started; running ones finish."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._pending.clear()
+
+    def _write(self, target_path: Path, preview_url: str, preview_type: str) -> None:
+        written = None
+        try:
+            if self.control is None or not self.control.is_cancelled():
+                written = False
+                self._bucket.acquire()
+                if preview_type == "video":
+                    written = self.client.download_video_first_frame_as_png(
+                        preview_url, target_path, max_dimension=self.max_dimension
+                    )
+                else:
+                    written = self.client.download_image_as_png(
+                        preview_url, target_path, max_dimension=self.max_dimension
+                    )
+        finally:
+            with self._lock:
+                self._pending.pop(str(target_path), None)
+                if written:
+                    self.written += 1
+                elif written is not None:
+                    self.failed += 1
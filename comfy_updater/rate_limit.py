@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import threading
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Rate a throttled client falls back to when no limit was configured.
+_UNLIMITED_BACKOFF_RATE = 4.0
+# Once an unlimited client climbs back here it drops the limit again.
+_UNLIMITED_CEILING = 50.0
+_MIN_RATE = 0.2
+# Consecutive failures (timeouts, connection errors, 5xx) that open the circuit.
+_FAILURE_THRESHOLD = 5
+_BASE_COOLDOWN_SECONDS = 15.0
+_MAX_COOLDOWN_SECONDS = 300.0
+_MAX_RETRY_AFTER_SECONDS = 300.0
+# Waits are sliced so cancellation is noticed promptly.
+_WAIT_SLICE_SECONDS = 0.5
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request a client makes.
+
+    Tokens refill at ``rate`` per second up to ``burst``; ``acquire`` blocks
+    until one is available. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                wait_seconds = self._reserve(time.monotonic())
+            if wait_seconds <= 0:
+                return
+            time.sleep(wait_seconds)
+
+    def _reserve(self, now: float) -> float:
+        """Take a token if one is available; otherwise return the wait. Caller holds the lock."""
+        if self.rate <= 0:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket whose rate follows the server (AIMD) behind a circuit breaker.
+
+    - every success adds back a little rate, up to the configured one
+    - 429/503 halve the rate and hold *all* requests for ``Retry-After``
+    - after ``_FAILURE_THRESHOLD`` consecutive failures the circuit opens and
+      requests wait out a cooldown; then one probe request decides whether
+      it closes again or reopens with a doubled cooldown
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        super().__init__(rate, burst)
+        self.configured_rate = self.rate
+        self.throttled = 0
+        self.state = CLOSED
+        self._failures = 0
+        self._cooldown = _BASE_COOLDOWN_SECONDS
+        self._open_until = 0.0
+        self._hold_until = 0.0
+        self._probing = False
+
+    def acquire(self, cancelled: Callable[[], bool] | None = None) -> bool:
+        """Block until a request may be sent. Returns False if *cancelled* fires first."""
+        while True:
+            if cancelled is not None and cancelled():
+                return False
+            with self._lock:
+                now = time.monotonic()
+                wait_seconds = max(0.0, self._hold_until - now)
+                if not wait_seconds and self.state == OPEN:
+                    if now < self._open_until:
+                        wait_seconds = self._open_until - now
+                    else:
+                        self.state = HALF_OPEN
+                        self._probing = False
+                if not wait_seconds and self.state == HALF_OPEN and self._probing:
+                    wait_seconds = _WAIT_SLICE_SECONDS
+                if not wait_seconds:
+                    wait_seconds = self._reserve(now)
+                    if not wait_seconds:
+                        if self.state == HALF_OPEN:
+                            self._probing = True
+                        return True
+            time.sleep(min(wait_seconds, _WAIT_SLICE_SECONDS))
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self._cooldown = _BASE_COOLDOWN_SECONDS
+            self._probing = False
+            if self.rate > 0:
+                ceiling = self.configured_rate or _UNLIMITED_CEILING
+                # Additive increase: about +1 request/s per second of successes,
+                # and never more than +1 per success at low rates.
+                self.rate = min(ceiling, self.rate + min(1.0, 1.0 / self.rate))
+                if not self.configured_rate and self.rate >= _UNLIMITED_CEILING:
+                    self.rate = 0.0
+
+    def on_throttle(self, retry_after: float | None) -> None:
+        """Multiplicative decrease after a 429/503, plus a global hold."""
+        with self._lock:
+            self.throttled += 1
+            current = self.rate or _UNLIMITED_BACKOFF_RATE * 2
+            self.rate = max(_MIN_RATE, current / 2)
+            self._tokens = min(self._tokens, 0.0)
+            # An unlimited bucket never refilled, so its clock is stale.
+            self._updated = time.monotonic()
+            if retry_after:
+                hold = min(_MAX_RETRY_AFTER_SECONDS, retry_after)
+                self._hold_until = max(self._hold_until, time.monotonic() + hold)
+            if self.state == HALF_OPEN:
+                # Throttling means the server is answering; stop probing.
+                self.state = CLOSED
+                self._probing = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN:
+                self._cooldown = min(_MAX_COOLDOWN_SECONDS, self._cooldown * 2)
+                self._open_locked()
+            elif self.state == CLOSED and self._failures >= _FAILURE_THRESHOLD:
+                self._open_locked()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = max(self._hold_until - now, self._open_until - now if self.state == OPEN else 0.0)
+            return {
+                "state": self.state,
+                "requestsPerSecond": round(self.rate, 2),
+                "configuredRequestsPerSecond": round(self.configured_rate, 2),
+                "throttled": self.throttled,
+                "retryInSeconds": round(max(0.0, wait_seconds), 1),
+            }
+
+    def _open_locked(self) -> None:
+        self.state = OPEN
+        self._probing = False
+        self._open_until = time.monotonic() + self._cooldown
+        print(f"Civitai updater: Civitai unreachable, pausing requests for {int(self._cooldown)}s")
+
+
+def wait_unless_cancelled(seconds: float, cancelled: Callable[[], bool] | None = None) -> bool:
+    """Sleep *seconds* in short slices. Returns False as soon as *cancelled* fires."""
+    deadline = time.monotonic() + seconds
+    while True:
+        if cancelled is not None and cancelled():
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, _WAIT_SLICE_SECONDS))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """``Retry-After`` as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def rate_from_delay_ms(delay_ms: int) -> float:
+    """Translate the legacy ``requestDelayMs`` spacing into requests per second."""
+    delay_ms = int(delay_ms)
+    return 1000.0 / delay_ms if delay_ms > 0 else 0.0
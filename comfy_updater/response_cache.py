@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import threading
+import time
+
+RESPONSE_CACHE_VERSION = 1
+
+# Entries untouched this long are deleted by ``prune`` even when a long TTL
+# would still allow revalidating them.
+MAX_ENTRY_AGE_SECONDS = 30 * 24 * 3600
+
+
+class ResponseCache:
+    """On-disk cache of successful Civitai API responses, one file per URL.
+
+    Entries younger than ``ttl_seconds`` are served without a request. Older
+    ones keep their ``ETag``/``Last-Modified`` validators so the next request
+    can be conditional; a ``304`` then renews the entry without a new body.
+    A TTL of 0 still revalidates, it just never skips the request.
+    """
+
+    def __init__(self, cache_dir: Path, ttl_seconds: int):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> tuple[dict | None, dict]:
+        """Return ``(fresh_body, conditional_headers)`` for *url*.
+
+        ``fresh_body`` is set only when the entry is within the TTL, and
+        counts as a hit. Otherwise it is None, counts as a miss, and the
+        headers carry whatever validators the stale entry has.
+        """
+        entry = self._read(url)
+        if entry and self.ttl_seconds and time.time() - entry.get("storedAt", 0) < self.ttl_seconds:
+            with self._lock:
+                self.hits += 1
+            return entry.get("body"), {}
+        with self._lock:
+            self.misses += 1
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = entry["lastModified"]
+        return None, headers
+
+    def revalidate(self, url: str) -> dict | None:
+        """Renew an entry after a ``304 Not Modified`` and return its body."""
+        entry = self._read(url)
+        if entry is None:
+            return None
+        entry["storedAt"] = time.time()
+        self._write(url, entry)
+        with self._lock:
+            self.revalidated += 1
+        return entry.get("body")
+
+    def store(self, url: str, body, etag: str = "", last_modified: str = "") -> None:
+        self._write(
+            url,
+            {
+                "version": RESPONSE_CACHE_VERSION,
+                "url": url,
+                "storedAt": time.time(),
+                "etag": etag or "",
+                "lastModified": last_modified or "",
+                "body": body,
+            },
+        )
+
+    def prune(self, max_age_seconds: int = MAX_ENTRY_AGE_SECONDS) -> int:
+        if not self.cache_dir.is_dir():
+            return 0
+        cutoff = time.time() - max(max_age_seconds, self.ttl_seconds)
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "responseCacheHits": self.hits,
+                "responseCacheMisses": self.misses,
+                "responseCacheRevalidated": self.revalidated,
+            }
+
+    def _entry_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read(self, url: str) -> dict | None:
+        path = self._entry_path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != RESPONSE_CACHE_VERSION or entry.get("url") != url:
+            return None
+        return entry
+
+    def _write(self, url: str, entry: dict) -> None:
+        path = self._entry_path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(entry, separators=(",", ":")), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as exc:
+            tmp_path.unlink(missing_ok=True)
+            print(f"Civitai updater: failed to write response cache entry: {exc}")
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 
 from aiohttp import web
 
 from .constants import SUPPORTED_MODEL_TYPES
 from .path_resolver import normalize_model_types
+from .preview_files import PREVIEW_ROUTE, content_type, find_preview, preview_etag, preview_variant
 from .sidecar import read_json, write_json
 
 try:
@@ -53,6 +55,31 @@ def register_routes(config_store, updater_service, job_manager) -> None:
             }
         )
 
+    @routes.get(PREVIEW_ROUTE)
+    async def get_preview(request):
+        size = _read_int_query(request, "size", default=0, minimum=0, maximum=4096)
+        loop = asyncio.get_running_loop()
+        preview = await loop.run_in_executor(
+            None,
+            _read_preview,
+            updater_service,
+            request.query.get("path", ""),
+            size,
+            config_store.data_dir / "previews",
+            request.headers.get("If-None-Match", ""),
+        )
+        if preview is None:
+            return web.json_response({"error": "preview not found"}, status=404)
+        status, body, mime_type, etag = preview
+        headers = {
+            "ETag": etag,
+            # Versioned URLs (``v`` = sidecar mtime) never change content.
+            "Cache-Control": "private, max-age=31536000, immutable" if request.query.get("v") else "no-cache",
+        }
+        if status == 304:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type=mime_type, headers=headers)
+
     @routes.post("/civitai-updater/jobs/scan")
     async def start_scan_job(request):
         payload = await _read_json(request)
@@ -63,6 +90,16 @@ def register_routes(config_store, updater_service, job_manager) -> None:
         )
         return web.json_response({"jobId": job.id})
 
+    @routes.post("/civitai-updater/jobs/verify")
+    async def start_verify_job(request):
+        payload = await _read_json(request)
+        payload = _normalize_job_payload(payload)
+        job = job_manager.start(
+            "verify",
+            lambda progress, item, control: updater_service.run_verify(payload, progress, item, control),
+        )
+        return web.json_response({"jobId": job.id})
+
     @routes.post("/civitai-updater/jobs/check-updates")
     async def start_check_updates_job(request):
         payload = await _read_json(request)
@@ -218,6 +255,21 @@ def register_routes(config_store, updater_service, job_manager) -> None:
     print("Civitai updater: routes registered")
 
 
+def _read_preview(updater_service, raw_path: str, size: int, cache_dir, if_none_match: str):
+    """Find (and resize) a preview off the event loop; ``(status, body, type, etag)`` or None."""
+    source = find_preview(raw_path, updater_service.get_effective_roots())
+    if source is None:
+        return None
+    try:
+        etag = preview_etag(source, size)
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return 304, b"", "", etag
+        served = preview_variant(source, size, cache_dir) if size else source
+        return 200, served.read_bytes(), content_type(served), etag
+    except OSError:
+        return None
+
+
 async def _read_json(request) -> dict:
     try:
         payload = await request.json()
@@ -253,6 +305,38 @@ def _normalize_config_payload(payload: dict) -> dict:
         incoming["maxRetries"] = payload.get("maxRetries")
     if "requestDelayMs" in payload:
         incoming["requestDelayMs"] = payload.get("requestDelayMs")
+    if "maxConcurrentRequests" in payload:
+        incoming["maxConcurrentRequests"] = payload.get("maxConcurrentRequests")
+    if "connectionPoolSize" in payload:
+        incoming["connectionPoolSize"] = payload.get("connectionPoolSize")
+    if "notFoundTtlHours" in payload:
+        incoming["notFoundTtlHours"] = payload.get("notFoundTtlHours")
+    if "hedgeRequests" in payload:
+        incoming["hedgeRequests"] = bool(payload.get("hedgeRequests"))
+    if "hedgePercentile" in payload:
+        incoming["hedgePercentile"] = payload.get("hedgePercentile")
+    if "previewWorkers" in payload:
+        incoming["previewWorkers"] = payload.get("previewWorkers")
+    if "previewDelayMs" in payload:
+        incoming["previewDelayMs"] = payload.get("previewDelayMs")
+    if "previewMaxDimension" in payload:
+        incoming["previewMaxDimension"] = payload.get("previewMaxDimension")
+    if "ffmpegConcurrency" in payload:
+        incoming["ffmpegConcurrency"] = payload.get("ffmpegConcurrency")
+    if "transcodeWorkers" in payload:
+        incoming["transcodeWorkers"] = payload.get("transcodeWorkers")
+    if "hashBatchSize" in payload:
+        incoming["hashBatchSize"] = payload.get("hashBatchSize")
+    if "hashWorkers" in payload:
+        incoming["hashWorkers"] = payload.get("hashWorkers")
+    if "hashChunkSizeKb" in payload:
+        incoming["hashChunkSizeKb"] = payload.get("hashChunkSizeKb")
+    if "hashDropPageCache" in payload:
+        incoming["hashDropPageCache"] = bool(payload.get("hashDropPageCache"))
+    if "importExternalHashes" in payload:
+        incoming["importExternalHashes"] = bool(payload.get("importExternalHashes"))
+    if isinstance(payload.get("hashDeviceLimits"), dict):
+        incoming["hashDeviceLimits"] = payload.get("hashDeviceLimits")
     if "useComfyPaths" in payload:
         incoming["useComfyPaths"] = bool(payload.get("useComfyPaths"))
     if "useExtraModelPaths" in payload:
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+import threading
+import time
+from typing import BinaryIO
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover - optional import guard
+    Image = None
+
+# Downloaded bytes kept in memory per preview before spilling to a temp file.
+SPOOL_MEMORY_BYTES = 1_000_000
+WEBP_QUALITY = 80
+
+
+def write_preview_images(source: BinaryIO | Path, png_path: Path, max_dimension: int = 0) -> float | None:
+    """Decode an image from *source* and write *png_path* plus a ``.webp`` next to it.
+
+    With *max_dimension* the image is scaled to fit a square of that size.
+    JPEGs are decoded at a reduced scale (``Image.draft``), so a worker never
+    holds the full-resolution bitmap. The WebP copy is best effort: Pillow
+    builds without WebP support only write the PNG, and an older WebP is
+    removed so it cannot shadow the new PNG. Returns the CPU seconds spent,
+    or None when nothing was written.
+    """
+    if Image is None:
+        return None
+    started = time.thread_time()
+    png_tmp = png_path.with_suffix(f"{png_path.suffix}.tmp")
+    webp_path = png_path.with_suffix(".webp")
+    webp_tmp = webp_path.with_suffix(f"{webp_path.suffix}.tmp")
+    png_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with Image.open(source) as opened:
+            image = _scaled(opened, max_dimension)
+            image.save(png_tmp, format="PNG")
+            try:
+                image.save(webp_tmp, format="WEBP", quality=WEBP_QUALITY)
+                webp_tmp.replace(webp_path)
+            except Exception:  # noqa: BLE001 - the PNG alone is still a valid preview
+                webp_tmp.unlink(missing_ok=True)
+                webp_path.unlink(missing_ok=True)
+        png_tmp.replace(png_path)
+        return time.thread_time() - started
+    except Exception:  # noqa: BLE001
+        png_tmp.unlink(missing_ok=True)
+        return None
+
+
+def write_thumbnail(source_path: Path, target_path: Path, max_dimension: int) -> bool:
+    """Write a WebP of *source_path* scaled to fit *max_dimension* (a cached resized variant)."""
+    if Image is None:
+        return False
+    # Concurrent requests may render the same variant; each writes its own temp file.
+    tmp_path = target_path.with_suffix(f".{threading.get_ident()}.tmp")
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with Image.open(source_path) as opened:
+            _scaled(opened, max_dimension).save(tmp_path, format="WEBP", quality=WEBP_QUALITY)
+        tmp_path.replace(target_path)
+        return True
+    except Exception:  # noqa: BLE001
+        tmp_path.unlink(missing_ok=True)
+        return False
+
+
+def _scaled(image, max_dimension: int):
+    if max_dimension > 0:
+        image.draft(image.mode, (max_dimension, max_dimension))
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    if max_dimension > 0:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    return image
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import BinaryIO
+
+from .thumbnails import write_preview_images
+from .video_frames import ProcessSlots
+
+TRANSCODE_TIMEOUT_SECONDS = 60
+WORKER_SCRIPT = Path(__file__).with_name("transcode_worker.py")
+
+
+class Transcoder:
+    """Worker processes for preview transcoding (decode, scale, PNG/WebP encode).
+
+    Pillow holds the GIL while it decodes and encodes, so on a job thread
+    it competes with the scan loop and ComfyUI's event loop. Up to
+    ``workers`` standalone Python processes (``transcode_worker.py``, which
+    imports only Pillow) take that work instead. They are started fresh
+    rather than forked from the threaded ComfyUI process, are reused
+    across images, and read and write files on disk, so no image data
+    crosses a pipe. With 0 workers, for file-handle sources, or when a
+    worker cannot be started, fails or runs past ``timeout_seconds``, the
+    image is transcoded inline on the calling thread. Like the ffmpeg limit,
+    the workers are shared by all jobs.
+    """
+
+    def __init__(self, workers: int = 0, timeout_seconds: float = TRANSCODE_TIMEOUT_SECONDS):
+        self.workers = max(0, int(workers))
+        self.timeout_seconds = timeout_seconds
+        self._slots = ProcessSlots(self.workers)
+        self._idle: list[_Worker] = []
+        self._lock = threading.Lock()
+
+    def resize(self, workers: int) -> None:
+        workers = max(0, int(workers))
+        with self._lock:
+            if workers == self.workers:
+                return
+            self.workers = workers
+            surplus, self._idle = self._idle[workers:], self._idle[:workers]
+        self._slots.resize(workers)
+        for worker in surplus:
+            worker.stop()
+
+    def transcode(
+        self,
+        source: Path | BinaryIO,
+        png_path: Path,
+        max_dimension: int = 0,
+        timings: TranscodeTimings | None = None,
+    ) -> bool:
+        """Write *png_path* (and its ``.webp``) from *source*, a file path or a binary file."""
+        started = time.perf_counter()
+        handled, cpu_seconds = False, None
+        if self.workers and isinstance(source, Path):
+            with self._slots.slot():
+                handled, cpu_seconds = self._in_worker(source, png_path, max_dimension)
+        if not handled:
+            cpu_seconds = write_preview_images(source, png_path, max_dimension)
+        if cpu_seconds is None:
+            return False
+        if timings is not None:
+            timings.record(cpu_seconds, time.perf_counter() - started)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def _in_worker(self, source: Path, png_path: Path, max_dimension: int) -> tuple[bool, float | None]:
+        """``(handled, cpu_seconds)``; not handled means the worker failed and the image goes inline.
+
+        A handled image that could not be decoded has no CPU seconds.
+        """
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        try:
+            if worker is None:
+                worker = _Worker()
+            reply = worker.request(
+                {"source": str(source), "target": str(png_path), "maxDimension": max_dimension},
+                timeout=self.timeout_seconds,
+            )
+        except (OSError, ValueError, queue.Empty) as exc:
+            print(f"Civitai updater: transcode worker failed ({str(exc) or 'timed out'}), transcoding inline")
+            if worker is not None:
+                worker.stop()
+            return False, None
+        with self._lock:
+            keep = len(self._idle) < self.workers
+            if keep:
+                self._idle.append(worker)
+        if not keep:
+            worker.stop()
+        return True, float(reply.get("cpuSeconds", 0.0)) if reply.get("ok") else None
+
+
+class _Worker:
+    def __init__(self):
+        self.process = subprocess.Popen(  # noqa: S603
+            [sys.executable, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self._replies: queue.Queue[str | None] = queue.Queue()
+        threading.Thread(target=self._read_replies, name="civitai-transcode", daemon=True).start()
+
+    def request(self, message: dict, timeout: float) -> dict:
+        """Send *message* and wait for its reply; ``queue.Empty`` after *timeout* seconds."""
+        self.process.stdin.write(json.dumps(message) + "\n")
+        self.process.stdin.flush()
+        reply = self._replies.get(timeout=timeout)
+        if reply is None:
+            raise OSError("worker exited")
+        return json.loads(reply)
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+    def _read_replies(self) -> None:
+        for line in self.process.stdout:
+            self._replies.put(line)
+        self._replies.put(None)
+
+
+class TranscodeTimings:
+    """Per-job transcode cost: images, CPU time and per-image wall time."""
+
+    def __init__(self):
+        self.images = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.max_wall_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, cpu_seconds: float, wall_seconds: float) -> None:
+        with self._lock:
+            self.images += 1
+            self.cpu_seconds += cpu_seconds
+            self.wall_seconds += wall_seconds
+            self.max_wall_seconds = max(self.max_wall_seconds, wall_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "imagesTranscoded": self.images,
+                "transcodeCpuSeconds": round(self.cpu_seconds, 3),
+                "transcodeMsPerImage": round(self.wall_seconds / self.images * 1000, 1) if self.images else 0.0,
+                "transcodeMaxMs": round(self.max_wall_seconds * 1000, 1),
+            }
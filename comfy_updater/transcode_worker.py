@@ -0,0 +1,33 @@
+"""
+Standalone preview transcode worker, started by ``transcode.Transcoder``.
+
+Run as a script, not imported: it loads only ``thumbnails`` (stdlib and
+Pillow) from its own directory, so neither ComfyUI nor this plugin is
+imported into the worker. Requests and replies are JSON lines on
+stdin/stdout; images are read from and written to disk.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+
+
+def main() -> None:
+    # The script directory is not on sys.path under ``-P``/``PYTHONSAFEPATH``.
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from thumbnails import write_preview_images
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        cpu_seconds = write_preview_images(
+            Path(request["source"]), Path(request["target"]), int(request.get("maxDimension", 0))
+        )
+        reply = {"ok": cpu_seconds is not None, "cpuSeconds": cpu_seconds or 0.0}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,38 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 import time
-from typing import Callable
+from typing import Callable, NamedTuple
 
-from .civitai_client import CivitaiClient
+from .civitai_client import CivitaiClient, RequestCancelled
+from .client_provider import CivitaiClientProvider
+from .device_scheduler import device_limit, order_for_devices
+from .fingerprint import CHANGED, MISSING, TOUCHED, UNCHANGED, build_fingerprint, fingerprint_status, stored_fingerprint
+from .hash_cache import HashCache
+from .hash_import import import_external_hashes
+from .model_headers import read_model_header
+from .negative_cache import NegativeCache
 from .path_resolver import list_model_files, normalize_model_types, resolve_model_roots
-from .sidecar import info_sidecar_path, preview_sidecar_path, read_json, write_json
-from .hashing import sha256_file
+from .payloads import LatestVersion
+from .preview_files import preview_file_url, prune_variants
+from .preview_queue import PreviewQueue
+from .rate_limit import rate_from_delay_ms
+from .response_cache import ResponseCache
+from .sidecar import info_sidecar_path, read_json, write_json
+from .hashing import DEFAULT_CHUNK_SIZE, HashPool, HashingCancelled, sample_fingerprint, sha256_file
 
 ProgressCallback = Callable[[int, int, str], None]
 ItemCallback = Callable[[dict], None]
 
 
 class UpdaterService:
-    def __init__(self, config_store):
+    def __init__(self, config_store, clients: CivitaiClientProvider | None = None):
         self.config_store = config_store
+        self.clients = clients or CivitaiClientProvider()
 
     def run_scan(
         self,
@@ -36,6 +52,15 @@ class UpdaterService:
     ) -> tuple[dict, list[dict]]:
         return self._run(payload, progress, mode="check", item_callback=item_callback, control=control)
 
+    def run_verify(
+        self,
+        payload: dict,
+        progress: ProgressCallback,
+        item_callback: ItemCallback | None = None,
+        control=None,
+    ) -> tuple[dict, list[dict]]:
+        return self._run(payload, progress, mode="verify", item_callback=item_callback, control=control)
+
     def get_effective_roots(
         self, model_types: list[str] | None = None, include_custom_paths: bool = True
     ) -> dict[str, list[str]]:
@@ -65,29 +90,125 @@ class UpdaterService:
         include_custom = bool(payload.get("includeCustomPaths", True))
         refetch_metadata = bool(payload.get("refetchMetadata", False))
         force_rehash = bool(payload.get("forceRehash", False))
-        request_delay_seconds = max(0.0, int(config.get("requestDelayMs", 120)) / 1000.0)
 
         roots = resolve_model_roots(config, model_types, include_custom_paths=include_custom)
-        files = _dedupe_model_files(list_model_files(roots))
+        files = order_for_devices(_dedupe_model_files(list_model_files(roots)))
         total = len(files)
+        if mode == "verify":
+            return self._run_verify(
+                config, files, model_types, include_custom, progress, item_callback, control
+            )
+        content_keys = _content_keys(files)
 
+        hash_cache = HashCache(self.config_store.data_dir / "hash_cache.json")
+        hashes_imported = 0
+        if config.get("importExternalHashes", True):
+            hashes_imported = import_external_hashes(files, roots, hash_cache)
+
+        not_found_cache = NegativeCache(
+            self.config_store.data_dir / "not_found.json",
+            ttl_seconds=int(config.get("notFoundTtlHours", 24)) * 3600,
+            refresh=force_rehash,
+        )
+
+        metrics = control.metrics if control else None
         version_index: dict[str, set[str]] = {}
-        if mode == "check":
-            for entry in files:
-                sidecar = read_json(info_sidecar_path(entry["path"]))
-                if sidecar:
-                    mid = str(sidecar.get("modelId") or "")
-                    vid = str(sidecar.get("id") or "")
-                    if mid and vid:
-                        version_index.setdefault(mid, set()).add(vid)
+        planned_hashes: set[str] = set()
+        # Planned hashes whose bytes are in the job's total: primaries the
+        # hash cache cannot answer.
+        planned_bytes: set[str] = set()
+        fingerprint_states: dict[str, str] = {}
+        # Unchanged files whose hash Civitai recently reported as unknown:
+        # neither hashed nor looked up again until the record expires.
+        known_unknown: dict[str, str] = {}
+        for entry in files:
+            sidecar = read_json(info_sidecar_path(entry["path"]))
+            if sidecar:
+                state = fingerprint_status(entry["path"], stored_fingerprint(sidecar))
+                fingerprint_states[str(entry["path"])] = state
+                if state == CHANGED:
+                    # Replaced since the sidecar was written; resolve it from scratch.
+                    sidecar = None
+            if mode == "check" and sidecar:
+                mid = str(sidecar.get("modelId") or "")
+                vid = str(sidecar.get("id") or "")
+                if mid and vid:
+                    version_index.setdefault(mid, set()).add(vid)
+            if _will_hash(mode, sidecar, refetch_metadata, force_rehash):
+                known_hash = _unchanged_sha256(
+                    entry, sidecar, fingerprint_states.get(str(entry["path"]), MISSING), hash_cache
+                )
+                if known_hash and not_found_cache.contains(known_hash):
+                    known_unknown[str(entry["path"])] = known_hash
+                    continue
+                planned_hashes.add(str(entry["path"]))
+                # Duplicates share their primary's hash, so only primaries add
+                # bytes, and a hash the cache already holds reads none.
+                if (
+                    metrics
+                    and content_keys[str(entry["path"])].primary == str(entry["path"])
+                    and (force_rehash or known_hash is None or hash_cache.peek(entry["path"]) is None)
+                ):
+                    planned_bytes.add(str(entry["path"]))
+                    metrics.add_bytes_total(entry.get("size", 0))
 
         progress(0, total, f"Discovered {total} model files")
 
-        client = CivitaiClient(
-            api_key=config.get("apiKey", ""),
-            timeout_seconds=int(config.get("requestTimeoutSeconds", 30)),
-            max_retries=int(config.get("maxRetries", 4)),
+        client = self.clients.client_for_job(
+            config,
+            # Refetching means "don't trust what we have": keep the cache for
+            # conditional requests but always ask the server.
+            response_cache=ResponseCache(
+                self.config_store.data_dir / "responses",
+                ttl_seconds=0 if refetch_metadata else int(config.get("cacheTtlMinutes", 240)) * 60,
+            ),
+            hash_batch_size=int(config.get("hashBatchSize", 50)),
+            not_found_cache=not_found_cache,
+            control=control,
+            hedge_percentile=int(config.get("hedgePercentile", 95)) if config.get("hedgeRequests") else 0,
+        )
+        # Previews are written in the background; items only queue them.
+        previews = PreviewQueue(
+            client,
+            workers=int(config.get("previewWorkers", 2)),
+            requests_per_second=rate_from_delay_ms(config.get("previewDelayMs", 50)),
+            max_dimension=int(config.get("previewMaxDimension", 512)),
+            control=control,
+        )
+        if metrics:
+            metrics.register_section("network", client.network_snapshot)
+            metrics.register_section("previews", previews.snapshot)
+        hash_pool = HashPool(
+            workers=int(config.get("hashWorkers", 4)),
+            hash_fn=partial(
+                _hash_model_file,
+                hash_cache=hash_cache,
+                force_rehash=force_rehash,
+                control=control,
+                chunk_size=int(config.get("hashChunkSizeKb", 1024)) * 1024,
+                drop_cache=bool(config.get("hashDropPageCache", True)),
+                metrics=metrics,
+                planned_hashes=planned_bytes,
+            ),
+            device_limit=partial(device_limit, limits=config.get("hashDeviceLimits", {})),
         )
+        models_prefetched = 0
+        if mode == "check" and version_index:
+            # Every sidecar's model is about to be asked for its latest
+            # version; one listing request covers a hundred of them.
+            progress(0, total, f"Fetching {len(version_index)} models from Civitai")
+            try:
+                models_prefetched = client.prefetch_models(sorted(version_index))
+            except RequestCancelled:
+                pass  # the job loop below stops at its first cancellation check
+
+        # Deep enough that every device queue has work even when one is
+        # saturated, and that a full lookup batch can collect.
+        prefetch_window = max(hash_pool.workers * 4, client.hash_batch_size)
+        next_prefetch = 0
+        hash_futures: dict[str, Future] = {}
+        # Hashes computed ahead of their item, waiting for a batched lookup.
+        ready_hashes: deque[str] = deque()
 
         stats = {
             "total": total,
@@ -96,58 +217,133 @@ class UpdaterService:
             "withUpdates": 0,
             "skipped": 0,
             "errors": 0,
+            "duplicates": 0,
         }
         items: list[dict] = []
 
-        for index, model_entry in enumerate(files, start=1):
-            if control:
-                control.wait_if_paused()
-                if control.is_cancelled():
+        concurrency = client.max_concurrency
+        item_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="civitai-updater-item")
+        in_flight: deque[tuple[dict, Future]] = deque()
+        next_submit = 0
+        done = 0
+
+        try:
+            while next_submit < total or in_flight:
+                # Keep up to `concurrency` models resolving against Civitai at
+                # once; the rate limiter inside the client paces the requests.
+                while next_submit < total and len(in_flight) < concurrency:
+                    if control:
+                        control.wait_if_paused()
+                        if control.is_cancelled():
+                            break
+
+                    # Keep the hash pool busy with files further down the list
+                    # while the current ones are being resolved.
+                    while next_prefetch < min(total, next_submit + prefetch_window):
+                        ahead = files[next_prefetch]
+                        next_prefetch += 1
+                        if str(ahead["path"]) in planned_hashes:
+                            hash_future = hash_pool.submit(
+                                ahead["path"],
+                                device=ahead.get("device"),
+                                key=content_keys[str(ahead["path"])].key,
+                            )
+                            hash_futures[str(ahead["path"])] = hash_future
+                            if client.hash_batch_size > 1:
+                                hash_future.add_done_callback(partial(_queue_ready_hash, ready_hashes))
+
+                    model_entry = files[next_submit]
+                    next_submit += 1
+
+                    # Resolve waiting hashes in one request once a batch is full,
+                    # or when this item's hash is ready and would otherwise be
+                    # looked up on its own.
+                    own_hash = hash_futures.pop(str(model_entry["path"]), None)
+                    if ready_hashes and (
+                        len(ready_hashes) >= client.hash_batch_size or _awaits_lookup(own_hash, client)
+                    ):
+                        client.prefetch_versions_by_hash([ready_hashes.popleft() for _ in range(len(ready_hashes))])
+                    future = item_pool.submit(
+                        self._process_one,
+                        client=client,
+                        previews=previews,
+                        model_path=model_entry["path"],
+                        model_type=model_entry["modelType"],
+                        mode=mode,
+                        refetch_metadata=refetch_metadata,
+                        force_rehash=force_rehash,
+                        version_index=version_index,
+                        fingerprint_state=fingerprint_states.get(str(model_entry["path"]), MISSING),
+                        hasher=partial(_shared_hash, hash_pool, hash_cache, content_keys),
+                        known_hash=known_unknown.get(str(model_entry["path"])),
+                    )
+                    in_flight.append((model_entry, future))
+
+                if not in_flight:
                     break
 
-            model_path = model_entry["path"]
-            model_type = model_entry["modelType"]
-            progress(index - 1, total, f"{mode}: {model_path.name}")
+                # Emit in discovery order so progress and the item stream stay stable.
+                model_entry, future = in_flight.popleft()
+                model_path = model_entry["path"]
+                model_type = model_entry["modelType"]
+                progress(done, total, f"{mode}: {model_path.name}")
 
-            try:
-                item = self._process_one(
-                    client=client,
-                    model_path=model_path,
-                    model_type=model_type,
-                    mode=mode,
-                    refetch_metadata=refetch_metadata,
-                    force_rehash=force_rehash,
-                    version_index=version_index,
-                )
-            except Exception as exc:  # noqa: BLE001 - return per-file errors without killing the whole job
-                stats["errors"] += 1
-                item = {
-                    "modelPath": str(model_path),
-                    "modelType": model_type,
-                    "modelId": "",
-                    "status": "error",
-                    "error": str(exc),
-                    "hasUpdate": False,
-                    "previewUrl": "",
-                    "previewType": "image",
-                    "lastCheckedAt": _utc_now(),
-                }
+                try:
+                    item = future.result()
+                except (HashingCancelled, RequestCancelled):
+                    break
+                except Exception as exc:  # noqa: BLE001 - return per-file errors without killing the whole job
+                    stats["errors"] += 1
+                    item = {
+                        "modelPath": str(model_path),
+                        "modelType": model_type,
+                        "modelId": "",
+                        "status": "error",
+                        "error": str(exc),
+                        "hasUpdate": False,
+                        "previewUrl": "",
+                        "previewType": "image",
+                        "lastCheckedAt": _utc_now(),
+                    }
+
+                if item.get("status") == "ok":
+                    stats["resolved"] += 1
+                if item.get("status") == "not_found":
+                    stats["notFound"] += 1
+                if item.get("status") == "skipped":
+                    stats["skipped"] += 1
+                if item.get("hasUpdate"):
+                    stats["withUpdates"] += 1
+
+                duplicate_of = _duplicate_of(content_keys[str(model_path)], model_path, hash_cache)
+                if duplicate_of:
+                    stats["duplicates"] += 1
+                    item["duplicateOf"] = duplicate_of
 
-            if item.get("status") == "ok":
-                stats["resolved"] += 1
-            if item.get("status") == "not_found":
-                stats["notFound"] += 1
-            if item.get("status") == "skipped":
-                stats["skipped"] += 1
-            if item.get("hasUpdate"):
-                stats["withUpdates"] += 1
-
-            items.append(item)
-            if item_callback:
-                item_callback(item)
-            progress(index, total, f"Processed {index}/{total}")
-            if request_delay_seconds > 0 and item.get("status") != "skipped":
-                time.sleep(request_delay_seconds)
+                items.append(item)
+                if item_callback:
+                    item_callback(item)
+                done += 1
+                progress(done, total, f"Processed {done}/{total}")
+                # Persist as the job goes, so a restart keeps what was hashed.
+                hash_cache.save_if_due()
+                not_found_cache.save_if_due()
+
+            # Items are done; let the preview backlog drain before finishing.
+            while previews.pending and not (control and control.is_cancelled()):
+                progress(done, total, f"Writing {previews.pending} previews")
+                previews.wait(timeout=0.5)
+        finally:
+            # Unstarted items are dropped; running ones finish (or stop at the
+            # next hash chunk when cancelled) before the caches are saved.
+            item_pool.shutdown(wait=True, cancel_futures=True)
+            previews.close()
+            hash_pool.shutdown()
+            hash_cache.save()
+            not_found_cache.save()
+            client.response_cache.prune()
+            prune_variants(self.config_store.data_dir / "previews")
+            client.close()
 
         if mode == "scan":
             summary = {
@@ -157,6 +353,19 @@ class UpdaterService:
                 "skipped": stats["skipped"],
                 "notFound": stats["notFound"],
                 "errors": stats["errors"],
+                "hashCacheHits": hash_cache.hits,
+                "hashCacheMisses": hash_cache.misses,
+                "hashesImported": hashes_imported,
+                "duplicates": stats["duplicates"],
+                "lookupsShared": client.shared_lookups,
+                "modelLookupsShared": client.model_lookups.shared,
+                "batchedLookups": client.batched_lookups,
+                "throttled": client.throttled,
+                "notFoundCached": not_found_cache.hits,
+                **client.hedger.stats(),
+                **client.transcode_timings.stats(),
+                **previews.stats(),
+                **client.response_cache.stats(),
                 "modelTypes": model_types,
                 "includeCustomPaths": include_custom,
             }
@@ -168,26 +377,167 @@ class UpdaterService:
                 "withUpdates": stats["withUpdates"],
                 "notFound": stats["notFound"],
                 "errors": stats["errors"],
+                "hashCacheHits": hash_cache.hits,
+                "hashCacheMisses": hash_cache.misses,
+                "hashesImported": hashes_imported,
+                "duplicates": stats["duplicates"],
+                "lookupsShared": client.shared_lookups,
+                "modelLookupsShared": client.model_lookups.shared,
+                "batchedLookups": client.batched_lookups,
+                "modelsPrefetched": models_prefetched,
+                "bulkModelRequests": client.bulk_model_requests,
+                "throttled": client.throttled,
+                "notFoundCached": not_found_cache.hits,
+                **client.hedger.stats(),
+                **client.transcode_timings.stats(),
+                **previews.stats(),
+                **client.response_cache.stats(),
                 "modelTypes": model_types,
                 "includeCustomPaths": include_custom,
             }
         return summary, items
 
+    def _run_verify(
+        self,
+        config: dict,
+        files: list[dict],
+        model_types: list[str],
+        include_custom: bool,
+        progress: ProgressCallback,
+        item_callback: ItemCallback | None,
+        control,
+    ) -> tuple[dict, list[dict]]:
+        """Rehash every file with a recorded SHA256 and compare; no network calls.
+
+        Hashes are always recomputed from disk (the hash cache is refreshed,
+        never trusted) and queued up front so every device stays busy.
+        """
+        total = len(files)
+        metrics = control.metrics if control else None
+        expected: dict[str, list[str]] = {}
+        planned_keys: set[str] = set()
+        for entry in files:
+            recorded = _recorded_sha256s(read_json(info_sidecar_path(entry["path"])))
+            if not recorded:
+                continue
+            expected[str(entry["path"])] = recorded
+            key = _identity_key(entry)
+            if metrics and key not in planned_keys:
+                metrics.add_bytes_total(entry.get("size", 0))
+            planned_keys.add(key)
+
+        hash_cache = HashCache(self.config_store.data_dir / "hash_cache.json")
+        hash_pool = HashPool(
+            workers=int(config.get("hashWorkers", 4)),
+            hash_fn=partial(
+                _hash_model_file,
+                hash_cache=hash_cache,
+                force_rehash=True,
+                control=control,
+                chunk_size=int(config.get("hashChunkSizeKb", 1024)) * 1024,
+                drop_cache=bool(config.get("hashDropPageCache", True)),
+                metrics=metrics,
+                planned_hashes=set(expected),
+            ),
+            device_limit=partial(device_limit, limits=config.get("hashDeviceLimits", {})),
+        )
+        progress(0, total, f"Discovered {total} model files")
+        for entry in files:
+            if str(entry["path"]) in expected:
+                hash_pool.submit(entry["path"], device=entry.get("device"), key=_identity_key(entry))
+
+        stats = {"total": total, "verified": 0, "mismatched": 0, "skipped": 0, "errors": 0}
+        items: list[dict] = []
+        started = time.monotonic()
+        try:
+            for index, model_entry in enumerate(files, start=1):
+                if control:
+                    control.wait_if_paused()
+                    if control.is_cancelled():
+                        break
+
+                model_path = model_entry["path"]
+                progress(index - 1, total, f"verify: {model_path.name}")
+                recorded = expected.get(str(model_path))
+                item = {
+                    "modelPath": str(model_path),
+                    "modelType": model_entry["modelType"],
+                    "status": "skipped",
+                    "expectedHash": recorded[0] if recorded else "",
+                    "localHash": "",
+                    "hasUpdate": False,
+                    "previewUrl": "",
+                    "previewType": "image",
+                    "lastCheckedAt": _utc_now(),
+                }
+                if recorded:
+                    try:
+                        local_hash = hash_pool.result(model_path, key=_identity_key(model_entry))
+                    except HashingCancelled:
+                        break
+                    except Exception as exc:  # noqa: BLE001 - report per-file errors
+                        stats["errors"] += 1
+                        item.update({"status": "error", "error": str(exc)})
+                    else:
+                        item["localHash"] = local_hash
+                        item["status"] = "ok" if local_hash in recorded else "mismatch"
+                if item["status"] == "ok":
+                    stats["verified"] += 1
+                elif item["status"] == "mismatch":
+                    stats["mismatched"] += 1
+                elif item["status"] == "skipped":
+                    stats["skipped"] += 1
+
+                items.append(item)
+                if item_callback:
+                    item_callback(item)
+                progress(index, total, f"Verified {index}/{total}")
+                # Rehashes are saved as they finish; an interrupted verify keeps them.
+                hash_cache.save_if_due()
+        finally:
+            hash_pool.shutdown()
+            hash_cache.save()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        bytes_hashed = metrics.snapshot()["bytesDone"] if metrics else 0
+        summary = {
+            "mode": "verify",
+            "total": stats["total"],
+            "verified": stats["verified"],
+            "mismatched": stats["mismatched"],
+            "skipped": stats["skipped"],
+            "errors": stats["errors"],
+            "bytesHashed": bytes_hashed,
+            "durationSeconds": round(elapsed, 1),
+            "throughputMBps": round(bytes_hashed / elapsed / 1_000_000, 1),
+            "modelTypes": model_types,
+            "includeCustomPaths": include_custom,
+        }
+        return summary, items
+
     def _process_one(
         self,
         client: CivitaiClient,
+        previews: PreviewQueue,
         model_path: Path,
         model_type: str,
         mode: str,
         refetch_metadata: bool,
         force_rehash: bool,
         version_index: dict[str, set[str]] | None = None,
+        fingerprint_state: str = MISSING,
+        hasher: Callable[[Path], str] = sha256_file,
+        known_hash: str | None = None,
     ) -> dict:
         info_path = info_sidecar_path(model_path)
 
         existing_info = read_json(info_path)
+        if existing_info and fingerprint_state == CHANGED:
+            existing_info = None
         if mode == "scan" and existing_info and not refetch_metadata:
-            _download_preview_if_needed(client, model_path, existing_info, force=False)
+            if fingerprint_state in (TOUCHED, MISSING):
+                _refresh_fingerprint(info_path, existing_info, model_path)
+            _queue_preview(previews, model_path, existing_info, force=False)
             _skip_url, _skip_type = _first_preview(existing_info)
             return {
                 "modelPath": str(model_path),
@@ -205,6 +555,7 @@ class UpdaterService:
                 "latestBaseModel": "",
                 "previewUrl": _skip_url,
                 "previewType": _skip_type,
+                "previewFileUrl": preview_file_url(model_path, expected=bool(_skip_url)),
                 "modelUrl": "",
                 "versionUrl": "",
                 "downloadUrl": "",
@@ -231,6 +582,10 @@ class UpdaterService:
             and existing_info.get("id")
         )
 
+        # A few KB of header give a name and base model for files Civitai
+        # does not know, before any hashing or network work happens.
+        header = None if can_use_sidecar else read_model_header(model_path)
+
         if can_use_sidecar:
             model_id = existing_info.get("modelId")
             version_data = {
@@ -243,7 +598,9 @@ class UpdaterService:
                 "model": existing_info.get("model", {}),
                 "images": existing_info.get("images", []),
             }
-            _download_preview_if_needed(client, model_path, version_data, force=False)
+            # Checks never rewrite a trusted sidecar; a missing or stale
+            # fingerprint is recorded by the next scan.
+            _queue_preview(previews, model_path, version_data, force=False)
         elif can_refetch_by_sidecar_id:
             model_id = existing_info.get("modelId")
             version_data = client.get_version(existing_info.get("id"))
@@ -251,12 +608,12 @@ class UpdaterService:
                 model_id = version_data.get("modelId") or model_id
             else:
                 # Fallback when the sidecar version id is stale or unavailable.
-                local_hash = sha256_file(model_path)
+                local_hash = hasher(model_path)
                 version_data = client.get_version_by_hash(local_hash)
                 if version_data:
                     model_id = version_data.get("modelId")
         else:
-            local_hash = sha256_file(model_path)
+            local_hash = known_hash or hasher(model_path)
             version_data = client.get_version_by_hash(local_hash)
             if version_data:
                 model_id = version_data.get("modelId")
@@ -266,8 +623,8 @@ class UpdaterService:
                 "modelPath": str(model_path),
                 "modelType": model_type,
                 "modelId": "",
-                "modelName": "",
-                "baseModel": "",
+                "modelName": header["name"] if header else "",
+                "baseModel": header["baseModel"] if header else "",
                 "status": "not_found",
                 "hasUpdate": False,
                 "localHash": local_hash or "",
@@ -284,9 +641,14 @@ class UpdaterService:
                     {
                         "id": "",
                         "modelId": "",
-                        "name": model_path.name,
+                        "name": (header["name"] if header else "") or model_path.name,
+                        "baseModel": header["baseModel"] if header else "",
                         "files": [{"hashes": {"SHA256": local_hash or ""}}],
-                        "extensions": {"source": "comfy-civitai-updater"},
+                        "extensions": {
+                            "source": "comfy-civitai-updater",
+                            "fingerprint": build_fingerprint(model_path),
+                            "header": header or {},
+                        },
                     },
                 )
             return payload
@@ -302,17 +664,18 @@ class UpdaterService:
             sidecar_payload.setdefault("extensions", {})
             sidecar_payload["extensions"]["source"] = "comfy-civitai-updater"
             sidecar_payload["extensions"]["updatedAt"] = _utc_now()
+            sidecar_payload["extensions"]["fingerprint"] = build_fingerprint(model_path)
             if refetch_metadata or not existing_info:
                 write_json(info_path, sidecar_payload)
 
-            _download_preview_if_needed(client, model_path, version_data, force=False)
+            _queue_preview(previews, model_path, version_data, force=False)
 
             return {
                 "modelPath": str(model_path),
                 "modelType": model_type,
                 "modelId": str(model_id),
                 "modelName": _model_name(version_data),
-                "baseModel": version_data.get("baseModel", ""),
+                "baseModel": version_data.get("baseModel", "") or (header["baseModel"] if header else ""),
                 "status": "ok",
                 "localHash": local_hash or "",
                 "localVersionId": version_data.get("id"),
@@ -323,25 +686,26 @@ class UpdaterService:
                 "hasUpdate": False,
                 "previewUrl": preview_url,
                 "previewType": preview_type,
+                "previewFileUrl": preview_file_url(model_path, expected=bool(preview_url)),
                 "modelUrl": model_url,
                 "versionUrl": version_url,
                 "downloadUrl": "",
                 "lastCheckedAt": _utc_now(),
             }
 
-        latest_version = client.get_latest_version_for_model(model_id) or {}
-        latest_id = latest_version.get("id")
+        latest = client.get_latest_version_for_model(model_id) or LatestVersion()
+        latest_id = latest.id
         local_id = version_data.get("id")
         has_update = bool(latest_id and local_id and str(latest_id) != str(local_id))
         if has_update and version_index and str(latest_id) in version_index.get(str(model_id), set()):
             has_update = False
 
-        creator_name = latest_version.get("_creatorName", "")
+        creator_name = latest.creator_name
         local_name = version_data.get("name", "")
-        latest_name = latest_version.get("name", local_name)
-        latest_download = _first_download_url(latest_version) or _first_download_url(version_data)
+        latest_name = latest.name or local_name
+        latest_download = latest.download_url or _first_download_url(version_data)
         local_preview_url, local_preview_type = _first_preview(version_data)
-        preview_url, preview_type = _first_preview(latest_version)
+        preview_url, preview_type = latest.preview_url, latest.preview_type
         if not preview_url:
             preview_url, preview_type = local_preview_url, local_preview_type
 
@@ -354,8 +718,9 @@ class UpdaterService:
             sidecar_payload.setdefault("extensions", {})
             sidecar_payload["extensions"]["source"] = "comfy-civitai-updater"
             sidecar_payload["extensions"]["updatedAt"] = _utc_now()
+            sidecar_payload["extensions"]["fingerprint"] = build_fingerprint(model_path)
             write_json(info_path, sidecar_payload)
-            _download_preview_if_needed(client, model_path, version_data)
+            _queue_preview(previews, model_path, version_data)
 
         return {
             "modelPath": str(model_path),
@@ -370,14 +735,15 @@ class UpdaterService:
             "localVersionDate": _version_date(version_data),
             "latestVersionId": latest_id,
             "latestVersionName": latest_name,
-            "latestBaseModel": latest_version.get("baseModel", ""),
-            "latestVersionDate": _version_date(latest_version),
+            "latestBaseModel": latest.base_model,
+            "latestVersionDate": latest.date,
             "hasUpdate": has_update,
             "creatorName": creator_name,
             "previewUrl": preview_url,
             "previewType": preview_type,
             "localPreviewUrl": local_preview_url,
             "localPreviewType": local_preview_type,
+            "previewFileUrl": preview_file_url(model_path, expected=bool(local_preview_url)),
             "modelUrl": model_url,
             "versionUrl": version_url,
             "downloadUrl": latest_download or "",
@@ -385,6 +751,189 @@ class UpdaterService:
         }
 
 
+def _will_hash(mode: str, existing_info: dict | None, refetch_metadata: bool, force_rehash: bool) -> bool:
+    """Mirror `_process_one`'s branching to decide whether a file will need its SHA256."""
+    if mode == "scan" and existing_info and not refetch_metadata:
+        return False
+    # With sidecar ids the file is resolved (or refetched) by id, and hashing
+    # is only a fallback that is left to run on demand.
+    has_ids = bool(existing_info and existing_info.get("modelId") and existing_info.get("id"))
+    return force_rehash or not has_ids
+
+
+def _unchanged_sha256(
+    entry: dict, sidecar: dict | None, fingerprint_state: str, hash_cache: HashCache
+) -> str | None:
+    """SHA256 already on record for a file that has not changed since it was hashed.
+
+    A placeholder sidecar whose fingerprint still matches records the hash
+    it was written for; otherwise the hash cache answers when size, mtime
+    and inode match.
+    """
+    if sidecar and fingerprint_state in (UNCHANGED, TOUCHED):
+        recorded = _recorded_sha256s(sidecar)
+        if recorded:
+            return recorded[0]
+    return hash_cache.peek(entry["path"])
+
+
+def _queue_ready_hash(ready_hashes: deque, future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        ready_hashes.append(future.result())
+
+
+def _awaits_lookup(hash_future: Future | None, client: CivitaiClient) -> bool:
+    """True when a prefetched hash is ready but has not been resolved yet."""
+    if hash_future is None or not hash_future.done():
+        return False
+    if hash_future.cancelled() or hash_future.exception() is not None:
+        return False
+    return hash_future.result().lower() not in client.hash_lookups
+
+
+def _hash_model_file(
+    model_path: Path,
+    hash_cache: HashCache,
+    force_rehash: bool,
+    control=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    drop_cache: bool = False,
+    metrics=None,
+    planned_hashes: set[str] | None = None,
+) -> str:
+    """Return the file's SHA256, reusing the persistent cache unless a rehash is forced.
+
+    Keeps the job's planned byte total honest: cache hits are taken out of
+    it and unplanned fallback hashes are added.
+    """
+    stat_result = model_path.stat()
+    planned = planned_hashes is not None and str(model_path) in planned_hashes
+    if not force_rehash:
+        cached = hash_cache.lookup(model_path, stat_result)
+        if cached:
+            if metrics and planned:
+                metrics.add_bytes_total(-stat_result.st_size)
+            return cached
+    if metrics and not planned:
+        metrics.add_bytes_total(stat_result.st_size)
+    local_hash = sha256_file(
+        model_path,
+        chunk_size=chunk_size,
+        control=control,
+        drop_cache=drop_cache,
+        on_bytes=metrics.add_bytes if metrics else None,
+    )
+    hash_cache.store(model_path, local_hash, stat_result)
+    return local_hash
+
+
+class _ContentKey(NamedTuple):
+    key: str
+    primary: str
+    # Path of a probable copy (same size, header digest and sample
+    # fingerprint). Only a matching full hash confirms it.
+    candidate_of: str = ""
+
+
+def _content_keys(files: list[dict]) -> dict[str, _ContentKey]:
+    """Map each model path to a key shared by every path with identical content.
+
+    Hard links and symlinks resolve to the same ``(st_dev, st_ino)`` and share
+    one key, so they are hashed once. Copies in other roots only sample a few
+    blocks, which cannot tell apart checkpoints that differ in one small
+    region (a baked-in VAE), so a file with the same size, header digest and
+    `sample_fingerprint` as another keeps its own key and is hashed in full;
+    ``candidate_of`` names the file it probably copies. Only files whose size
+    collides with another file are read at all. Entries must already carry
+    ``device``/``inode``/``size`` (see `group_model_files_by_device`).
+    """
+    keys: dict[str, _ContentKey] = {}
+    by_identity: dict[tuple[int, int], _ContentKey] = {}
+    by_size: dict[int, list[dict]] = {}
+    candidates_of: dict[_ContentKey, str] = {}
+    for entry in files:
+        path = str(entry["path"])
+        identity = (entry.get("device", -1), entry.get("inode", 0))
+        if identity[0] < 0 or not identity[1]:
+            keys[path] = _ContentKey(path, path)
+            continue
+        if identity in by_identity:
+            keys[path] = by_identity[identity]
+            continue
+        keys[path] = by_identity[identity] = _ContentKey(f"inode:{identity[0]}:{identity[1]}", path)
+        by_size.setdefault(entry.get("size", 0), []).append(entry)
+
+    for size, entries in by_size.items():
+        if size <= 0 or len(entries) < 2:
+            continue
+        # Same-size models usually differ in their header (training metadata,
+        # tensor layout); only header matches are worth sampling.
+        by_header: dict[str, list[dict]] = {}
+        for entry in entries:
+            header = read_model_header(entry["path"])
+            by_header.setdefault(header["headerDigest"] if header else "", []).append(entry)
+        for candidates in by_header.values():
+            if len(candidates) < 2:
+                continue
+            by_fingerprint: dict[str, _ContentKey] = {}
+            for entry in candidates:
+                try:
+                    fingerprint = sample_fingerprint(entry["path"], size)
+                except OSError:
+                    continue
+                own = by_identity[(entry["device"], entry["inode"])]
+                shared = by_fingerprint.setdefault(fingerprint, own)
+                if shared != own:
+                    candidates_of[own] = shared.primary
+
+    if candidates_of:
+        keys = {
+            path: content_key._replace(candidate_of=candidates_of[content_key])
+            if content_key in candidates_of
+            else content_key
+            for path, content_key in keys.items()
+        }
+    return keys
+
+
+def _duplicate_of(content_key: _ContentKey, model_path: Path, hash_cache: HashCache) -> str:
+    """The path *model_path* duplicates, or "" when it is not a known duplicate.
+
+    Links are duplicates by identity; a probable copy only once both files
+    have been hashed to the same value.
+    """
+    if content_key.primary != str(model_path):
+        return content_key.primary
+    if content_key.candidate_of:
+        own_hash = hash_cache.peek(model_path)
+        if own_hash and own_hash == hash_cache.peek(Path(content_key.candidate_of)):
+            return content_key.candidate_of
+    return ""
+
+
+def _identity_key(entry: dict) -> str:
+    """Hash pool key shared by hard links and symlinks only (never by copies)."""
+    if entry.get("inode"):
+        return f"inode:{entry.get('device')}:{entry['inode']}"
+    return str(entry["path"])
+
+
+def _shared_hash(
+    hash_pool: HashPool,
+    hash_cache: HashCache,
+    content_keys: dict[str, _ContentKey],
+    model_path: Path,
+) -> str:
+    """Hash through the pool once per content key and fan the result out to *model_path*."""
+    content_key = content_keys.get(str(model_path))
+    if content_key is None:
+        return hash_pool.result(model_path)
+    local_hash = hash_pool.result(Path(content_key.primary), key=content_key.key)
+    if content_key.primary != str(model_path):
+        hash_cache.store(model_path, local_hash)
+    return local_hash
+
+
 def _dedupe_model_files(files: list[dict]) -> list[dict]:
     seen = set()
     deduped = []
@@ -454,22 +1003,37 @@ def _set_sha256_hash(version_data: dict, sha256_hash: str) -> None:
     first_file["hashes"] = hashes
 
 
-def _download_preview_if_needed(
-    client: CivitaiClient,
+def _recorded_sha256s(sidecar: dict | None) -> list[str]:
+    """SHA256 values a sidecar records, the `_set_sha256_hash` slot (first file) first."""
+    if not sidecar:
+        return []
+    recorded: list[str] = []
+    for file_info in sidecar.get("files") or []:
+        if not isinstance(file_info, dict) or not isinstance(file_info.get("hashes"), dict):
+            continue
+        value = file_info["hashes"].get("SHA256")
+        if isinstance(value, str) and value and value.lower() not in recorded:
+            recorded.append(value.lower())
+    return recorded
+
+
+def _refresh_fingerprint(info_path: Path, sidecar: dict, model_path: Path) -> None:
+    """Record the current fingerprint on a sidecar that is still trusted as-is (scan only)."""
+    extensions = sidecar.get("extensions")
+    if not isinstance(extensions, dict):
+        extensions = {}
+    extensions["fingerprint"] = build_fingerprint(model_path)
+    write_json(info_path, {**sidecar, "extensions": extensions})
+
+
+def _queue_preview(
+    previews: PreviewQueue,
     model_path: Path,
     version_data: dict,
     force: bool = False,
 ) -> None:
     preview_url, preview_type = _first_preview(version_data)
-    if not preview_url:
-        return
-    preview_path = preview_sidecar_path(model_path)
-    if not force and preview_path.exists():
-        return
-    if preview_type == "video":
-        client.download_video_first_frame_as_png(preview_url, preview_path)
-        return
-    client.download_image_as_png(preview_url, preview_path)
+    previews.submit(model_path, preview_url, preview_type, force=force)
 
 
 def _utc_now() -> str:
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+import struct
+import subprocess
+import threading
+from typing import Iterable, Iterator
+
+# Leading bytes inspected for the MP4 box layout before picking a strategy.
+PROBE_BYTES = 1_000_000
+FFMPEG_TIMEOUT_SECONDS = 60
+
+STREAMABLE = "streamable"
+MOOV_AT_END = "moov_at_end"
+UNKNOWN = "unknown"
+
+# Top-level ISO-BMFF boxes that may precede ``moov``/``mdat``.
+_LEADING_BOXES = {b"ftyp", b"free", b"skip", b"wide", b"uuid", b"pdin", b"styp"}
+
+
+class ProcessSlots:
+    """Resizable limit on concurrently running ffmpeg processes."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._active = 0
+        self._condition = threading.Condition()
+
+    def resize(self, limit: int) -> None:
+        with self._condition:
+            self.limit = max(1, int(limit))
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+
+def mp4_layout(head: bytes) -> str:
+    """Judge from the top-level boxes in *head* whether ffmpeg can read the video as a stream.
+
+    ``STREAMABLE`` when ``moov`` comes before ``mdat`` or the data is not
+    ISO-BMFF at all (WebM and friends decode sequentially), ``MOOV_AT_END``
+    when ``mdat`` comes first, ``UNKNOWN`` when *head* ends too early.
+    """
+    offset = 0
+    while offset + 8 <= len(head):
+        size, kind = struct.unpack(">I4s", head[offset:offset + 8])
+        if kind == b"moov":
+            return STREAMABLE
+        if kind == b"mdat":
+            return MOOV_AT_END
+        if kind not in _LEADING_BOXES:
+            return STREAMABLE if offset == 0 else UNKNOWN
+        if size == 1:
+            if offset + 16 > len(head):
+                return UNKNOWN
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        elif size == 0:
+            # The box runs to the end of the file, so no moov follows it.
+            return MOOV_AT_END
+        if size < 8:
+            return UNKNOWN
+        offset += size
+    return UNKNOWN
+
+
+def extract_first_frame(
+    ffmpeg_path: str,
+    chunks: Iterable[bytes],
+    frame_path: Path,
+    video_path: Path,
+    slots: ProcessSlots,
+) -> bool:
+    """Write the first video frame of the downloaded *chunks* to *frame_path*.
+
+    Fast-start files (``moov`` up front) are piped into ffmpeg, which exits
+    after the first frame; the remaining chunks are never read. Otherwise
+    the download continues into *video_path* and ffmpeg reads that file.
+    """
+    chunks = iter(chunks)
+    head = bytearray()
+    layout = UNKNOWN
+    for chunk in chunks:
+        head += chunk
+        layout = mp4_layout(head)
+        if layout != UNKNOWN or len(head) >= PROBE_BYTES:
+            break
+    if not head:
+        return False
+
+    if layout == STREAMABLE:
+        with slots.slot():
+            return _frame_from_pipe(ffmpeg_path, chain([bytes(head)], chunks), frame_path)
+
+    with video_path.open("wb") as fh:
+        fh.write(head)
+        for chunk in chunks:
+            fh.write(chunk)
+    with slots.slot():
+        return _frame_from_file(ffmpeg_path, video_path, frame_path)
+
+
+def _frame_from_pipe(ffmpeg_path: str, chunks: Iterator[bytes], frame_path: Path) -> bool:
+    process = subprocess.Popen(  # noqa: S603
+        [ffmpeg_path, "-y", "-loglevel", "error", "-i", "pipe:0", "-frames:v", "1", str(frame_path)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for chunk in chunks:
+            try:
+                process.stdin.write(chunk)
+            except OSError:
+                break  # ffmpeg has its frame and closed the pipe
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        process.wait(timeout=FFMPEG_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return False
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    return _frame_written(process.returncode, frame_path)
+
+
+def _frame_from_file(ffmpeg_path: str, video_path: Path, frame_path: Path) -> bool:
+    try:
+        process = subprocess.run(  # noqa: S603
+            [ffmpeg_path, "-y", "-loglevel", "error", "-i", str(video_path), "-frames:v", "1", str(frame_path)],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        return False
+    return _frame_written(process.returncode, frame_path)
+
+
+def _frame_written(returncode: int | None, frame_path: Path) -> bool:
+    return returncode == 0 and frame_path.is_file() and frame_path.stat().st_size > 0
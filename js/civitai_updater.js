@@ -13,9 +13,19 @@ const POLL_MS = 800;
 const SETTINGS = {
   apiKey: "CivitaiUpdater.APIKey",
   cacheTtlMinutes: "CivitaiUpdater.CacheTtlMinutes",
+  notFoundTtlHours: "CivitaiUpdater.NotFoundTtlHours",
   requestTimeoutSeconds: "CivitaiUpdater.RequestTimeoutSeconds",
   maxRetries: "CivitaiUpdater.MaxRetries",
   requestDelayMs: "CivitaiUpdater.RequestDelayMs",
+  maxConcurrentRequests: "CivitaiUpdater.MaxConcurrentRequests",
+  connectionPoolSize: "CivitaiUpdater.ConnectionPoolSize",
+  hedgeRequests: "CivitaiUpdater.HedgeRequests",
+  hedgePercentile: "CivitaiUpdater.HedgePercentile",
+  previewWorkers: "CivitaiUpdater.PreviewWorkers",
+  previewDelayMs: "CivitaiUpdater.PreviewDelayMs",
+  previewMaxDimension: "CivitaiUpdater.PreviewMaxDimension",
+  ffmpegConcurrency: "CivitaiUpdater.FfmpegConcurrency",
+  transcodeWorkers: "CivitaiUpdater.TranscodeWorkers",
   useComfyPaths: "CivitaiUpdater.PathSources.UseComfy",
   useExtraModelPaths: "CivitaiUpdater.PathSources.UseExtraModelPaths",
   useCustomPaths: "CivitaiUpdater.PathSources.UseCustom",
@@ -34,6 +44,9 @@ const state = {
   currentSummary: null,
   currentProgress: 0,
   currentTotal: 0,
+  currentBytes: null,
+  currentNetwork: null,
+  currentPreviews: null,
   currentItemCount: 0,
   pollTimer: null,
   lastStatus: "",
@@ -85,10 +98,20 @@ app.registerExtension({
   name: EXTENSION_NAME,
   settings: [
     { id: SETTINGS.apiKey, name: "API Key", type: "text", defaultValue: "", attrs: { type: "password", autocomplete: "off" }, tooltip: "Optional Civitai API key for restricted resources.", category: ["Civitai Updater", "Network", "API Key"], onChange: () => scheduleSettingsSync() },
-    { id: SETTINGS.cacheTtlMinutes, name: "Cache Duration (minutes)", type: "number", defaultValue: 240, attrs: { min: 0, max: 10080, step: 30 }, tooltip: "How long to reuse cached check results before re-checking. 0 = always check fresh.", category: ["Civitai Updater", "General", "Cache Duration"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.cacheTtlMinutes, name: "Cache Duration (minutes)", type: "number", defaultValue: 240, attrs: { min: 0, max: 10080, step: 30 }, tooltip: "How long to reuse cached check results and Civitai responses before re-checking. 0 = always check fresh.", category: ["Civitai Updater", "General", "Cache Duration"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.notFoundTtlHours, name: "Remember Unknown Models (hours)", type: "number", defaultValue: 24, attrs: { min: 0, max: 720, step: 1 }, tooltip: "How long files Civitai does not know (private merges, own trainings) are skipped without rehashing or re-asking. Force rehash ignores this. 0 = always ask.", category: ["Civitai Updater", "General", "Unknown Models"], onChange: () => scheduleSettingsSync() },
     { id: SETTINGS.requestTimeoutSeconds, name: "Request Timeout (seconds)", type: "number", defaultValue: 30, attrs: { min: 5, max: 300, step: 1 }, category: ["Civitai Updater", "Network", "Request Timeout"], onChange: () => scheduleSettingsSync() },
     { id: SETTINGS.maxRetries, name: "Max Retries", type: "number", defaultValue: 4, attrs: { min: 0, max: 10, step: 1 }, category: ["Civitai Updater", "Network", "Max Retries"], onChange: () => scheduleSettingsSync() },
-    { id: SETTINGS.requestDelayMs, name: "Delay Between Models (ms)", type: "number", defaultValue: 120, attrs: { min: 0, max: 3000, step: 10 }, tooltip: "Small delay between model checks to reduce request bursts.", category: ["Civitai Updater", "Network", "Request Delay"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.requestDelayMs, name: "Delay Between Requests (ms)", type: "number", defaultValue: 120, attrs: { min: 0, max: 3000, step: 10 }, tooltip: "Minimum average spacing between Civitai API requests, shared by all parallel lookups. 0 = no rate limit.", category: ["Civitai Updater", "Network", "Request Delay"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.maxConcurrentRequests, name: "Parallel Requests", type: "number", defaultValue: 4, attrs: { min: 1, max: 16, step: 1 }, tooltip: "How many models are looked up on Civitai at the same time.", category: ["Civitai Updater", "Network", "Parallel Requests"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.connectionPoolSize, name: "Connection Pool Size", type: "number", defaultValue: 0, attrs: { min: 0, max: 64, step: 1 }, tooltip: "Keep-alive connections to Civitai kept open between jobs. 0 = one per parallel request (two when hedging).", category: ["Civitai Updater", "Network", "Connection Pool"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.hedgeRequests, name: "Hedge Slow Requests", type: "boolean", defaultValue: false, tooltip: "Send a second copy of a Civitai request that is slower than usual and use whichever answers first. Costs some extra requests.", category: ["Civitai Updater", "Network", "Hedge Requests"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.hedgePercentile, name: "Hedge After Percentile", type: "number", defaultValue: 95, attrs: { min: 50, max: 99, step: 1 }, tooltip: "A request is hedged once it has taken longer than this percentile of recent requests.", category: ["Civitai Updater", "Network", "Hedge Percentile"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.previewWorkers, name: "Parallel Preview Downloads", type: "number", defaultValue: 2, attrs: { min: 1, max: 8, step: 1 }, tooltip: "Preview images written in the background while models are scanned.", category: ["Civitai Updater", "Previews", "Parallel Downloads"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.previewDelayMs, name: "Delay Between Preview Downloads (ms)", type: "number", defaultValue: 50, attrs: { min: 0, max: 3000, step: 10 }, tooltip: "Average spacing between preview downloads. Separate from the API request delay. 0 = no limit.", category: ["Civitai Updater", "Previews", "Download Delay"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.previewMaxDimension, name: "Preview Size (px)", type: "number", defaultValue: 512, attrs: { min: 0, max: 4096, step: 64 }, tooltip: "Longest side of saved preview images. A smaller WebP copy is written next to each PNG. 0 = full size.", category: ["Civitai Updater", "Previews", "Preview Size"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.ffmpegConcurrency, name: "Parallel Video Frame Extractions", type: "number", defaultValue: 2, attrs: { min: 1, max: 8, step: 1 }, tooltip: "How many ffmpeg processes may extract video preview frames at once, across all jobs.", category: ["Civitai Updater", "Previews", "ffmpeg Processes"], onChange: () => scheduleSettingsSync() },
+    { id: SETTINGS.transcodeWorkers, name: "Image Transcode Processes", type: "number", defaultValue: 2, attrs: { min: 0, max: 8, step: 1 }, tooltip: "Worker processes that decode, resize and encode preview images, so this CPU work stays off ComfyUI's server process. 0 converts images in-process.", category: ["Civitai Updater", "Previews", "Transcode Processes"], onChange: () => scheduleSettingsSync() },
     { id: SETTINGS.useComfyPaths, name: "Use Comfy Default Paths", type: "boolean", defaultValue: true, category: ["Civitai Updater", "Path Sources", "Comfy Defaults"], onChange: () => scheduleSettingsSync() },
     { id: SETTINGS.useExtraModelPaths, name: "Use extra_model_paths.yaml", type: "boolean", defaultValue: true, category: ["Civitai Updater", "Path Sources", "Extra Model Paths"], onChange: () => scheduleSettingsSync() },
     { id: SETTINGS.useCustomPaths, name: "Use Custom Paths", type: "boolean", defaultValue: true, category: ["Civitai Updater", "Path Sources", "Custom Paths"], onChange: () => scheduleSettingsSync() },
@@ -129,9 +152,9 @@ async function renderTab(el) {
           <div class="cu-label">Model Scope</div>
           <div class="cu-row">${MODEL_TYPES.map((t) => `<label class="cu-chip" title="Include ${t} in jobs"><input type="checkbox" data-type="${t}" checked><span>${t.charAt(0).toUpperCase() + t.slice(1)}</span></label>`).join("")}</div>
           <div class="cu-label">Options</div>
-          <label class="cu-option" title="Re-identify every model by recomputing its SHA256 hash, even if cached metadata exists. Use this after manually replacing model files — the cache won't know the file changed otherwise."><input id="cu-rehash" type="checkbox"><span>Force rehash</span></label>
+          <label class="cu-option" title="Re-identify every model by recomputing its SHA256 hash, even if cached metadata exists. Replaced model files are detected automatically; use this to audit files that look unchanged."><input id="cu-rehash" type="checkbox"><span>Force rehash</span></label>
           <p class="cu-option-hint">Re-identify models from scratch. Use after replacing files.</p>
-          <label class="cu-option" title="During metadata scans, re-fetch info from Civitai for models that already have a .civitai.info file. Uses sidecar version IDs for speed; enable Force rehash if files were manually replaced."><input id="cu-refetch" type="checkbox"><span>Refetch existing metadata during scans</span></label>
+          <label class="cu-option" title="During metadata scans, re-fetch info from Civitai for models that already have a .civitai.info file. Uses sidecar version IDs for speed; replaced files are detected and rehashed automatically."><input id="cu-refetch" type="checkbox"><span>Refetch existing metadata during scans</span></label>
           <div class="cu-divider"></div>
           <div class="cu-head">
             <div class="cu-label">Resolved Roots</div>
@@ -411,6 +434,14 @@ function pollJob(jobId) {
       state.currentProgress = progress;
       state.currentTotal = total;
       state.currentItemCount = itemCount;
+      state.currentBytes = {
+        total: Number(job.bytesTotal || 0),
+        done: Number(job.bytesDone || 0),
+        mbps: Number(job.throughputMBps || 0),
+        eta: job.etaSeconds,
+      };
+      state.currentNetwork = job.network || null;
+      state.currentPreviews = job.previews || null;
       updateProgress(progress, total, true);
       renderProgressCounts();
       updateControlButtons();
@@ -469,6 +500,9 @@ function pollJob(jobId) {
         state.currentProgress = 0;
         state.currentTotal = 0;
         state.currentItemCount = 0;
+        state.currentBytes = null;
+        state.currentNetwork = null;
+        state.currentPreviews = null;
         updateControlButtons();
       }
     } catch (error) {
@@ -530,7 +564,7 @@ function renderProgressCounts() {
   const s = state.currentSummary;
   if (!s || !s.mode) {
     if (state.currentJobId) {
-      state.statusEl.textContent = `Processing ${state.currentProgress} of ${state.currentTotal}`;
+      state.statusEl.textContent = `Processing ${state.currentProgress} of ${state.currentTotal}${formatByteProgress(state.currentBytes)}${formatNetworkState(state.currentNetwork)}${formatPreviewBacklog(state.currentPreviews)}`;
     }
     return;
   }
@@ -541,6 +575,31 @@ function renderProgressCounts() {
   state.statusEl.textContent = `${s.total || 0} checked \u00b7 ${s.withUpdates || 0} updates \u00b7 ${s.notFound || 0} not found \u00b7 ${s.errors || 0} errors`;
 }
 
+function formatByteProgress(bytes) {
+  if (!bytes || bytes.total <= 0) return "";
+  const gb = (value) => (value / 1e9).toFixed(1);
+  let text = ` \u00b7 hashed ${gb(bytes.done)}/${gb(bytes.total)} GB`;
+  if (bytes.mbps > 0) text += ` \u00b7 ${bytes.mbps} MB/s`;
+  if (typeof bytes.eta === "number" && bytes.done < bytes.total) {
+    const eta = Math.round(bytes.eta);
+    text += ` \u00b7 ~${eta >= 60 ? `${Math.round(eta / 60)}m` : `${eta}s`} left`;
+  }
+  return text;
+}
+
+function formatNetworkState(network) {
+  if (!network) return "";
+  const wait = Math.round(Number(network.retryInSeconds || 0));
+  if (network.state === "open") return ` \u00b7 Civitai unreachable, retrying in ${wait}s`;
+  if (wait > 0) return ` \u00b7 rate limited, resuming in ${wait}s`;
+  return "";
+}
+
+function formatPreviewBacklog(previews) {
+  const queued = Number(previews?.queued || 0);
+  return queued > 0 ? ` \u00b7 ${queued} previews queued` : "";
+}
+
 function renderCacheInfo() {
   if (!state.cacheInfoEl) return;
   if (!state.cachedAt) {
@@ -636,8 +695,13 @@ function renderResults() {
       return `<div class="cu-ver-row"><span class="cu-ver-label" data-role="saved">Saved</span>${datePill}${basePill}<span class="cu-ver-link cu-copy-path" data-path="${escapeHtml(v.modelPath || "")}" title="Click to copy file path">${escapeHtml(v.versionName || "?")}</span></div>`;
     }).join("");
 
+    // Without an update the latest version is the local one, so its preview
+    // can come from the sidecar on disk instead of the Civitai CDN.
+    const localPreview = item.hasUpdate ? "" : localPreviewFile(localVersions);
     let thumbHtml;
-    if (item.previewUrl && item.previewType === "video") {
+    if (localPreview) {
+      thumbHtml = localPreviewImg(localPreview, 128, item, ' loading="lazy"');
+    } else if (item.previewUrl && item.previewType === "video") {
       thumbHtml = `<video src="${escapeHtml(item.previewUrl)}#t=0.5" preload="metadata" muted playsinline></video>`;
     } else if (item.previewUrl) {
       thumbHtml = `<img src="${escapeHtml(item.previewUrl)}" alt="" loading="lazy">`;
@@ -672,6 +736,7 @@ function renderResults() {
         });
       });
     }
+    bindPreviewFallbacks(card);
     card.querySelector(".cu-thumb").addEventListener("click", () => openLightbox(item));
     state.resultsEl.appendChild(card);
   }
@@ -771,9 +836,19 @@ async function hydrateSettingsFromBackend() {
     const cfg = data.config || {};
     state.suspendSettingsSync = true;
     setSetting(SETTINGS.cacheTtlMinutes, Number(cfg.cacheTtlMinutes ?? 240));
+    setSetting(SETTINGS.notFoundTtlHours, Number(cfg.notFoundTtlHours ?? 24));
     setSetting(SETTINGS.requestTimeoutSeconds, Number(cfg.requestTimeoutSeconds ?? 30));
     setSetting(SETTINGS.maxRetries, Number(cfg.maxRetries ?? 4));
     setSetting(SETTINGS.requestDelayMs, Number(cfg.requestDelayMs ?? 120));
+    setSetting(SETTINGS.maxConcurrentRequests, Number(cfg.maxConcurrentRequests ?? 4));
+    setSetting(SETTINGS.connectionPoolSize, Number(cfg.connectionPoolSize ?? 0));
+    setSetting(SETTINGS.hedgeRequests, Boolean(cfg.hedgeRequests ?? false));
+    setSetting(SETTINGS.hedgePercentile, Number(cfg.hedgePercentile ?? 95));
+    setSetting(SETTINGS.previewWorkers, Number(cfg.previewWorkers ?? 2));
+    setSetting(SETTINGS.previewDelayMs, Number(cfg.previewDelayMs ?? 50));
+    setSetting(SETTINGS.previewMaxDimension, Number(cfg.previewMaxDimension ?? 512));
+    setSetting(SETTINGS.ffmpegConcurrency, Number(cfg.ffmpegConcurrency ?? 2));
+    setSetting(SETTINGS.transcodeWorkers, Number(cfg.transcodeWorkers ?? 2));
     setSetting(SETTINGS.useComfyPaths, Boolean(cfg.useComfyPaths ?? true));
     setSetting(SETTINGS.useExtraModelPaths, Boolean(cfg.useExtraModelPaths ?? true));
     setSetting(SETTINGS.useCustomPaths, Boolean(cfg.useCustomPaths ?? true));
@@ -800,9 +875,19 @@ async function syncSettingsToBackend() {
   const payload = {
     apiKey: String(getSetting(SETTINGS.apiKey, "") || ""),
     cacheTtlMinutes: Number(getSetting(SETTINGS.cacheTtlMinutes, 240)),
+    notFoundTtlHours: Number(getSetting(SETTINGS.notFoundTtlHours, 24)),
     requestTimeoutSeconds: Number(getSetting(SETTINGS.requestTimeoutSeconds, 30)),
     maxRetries: Number(getSetting(SETTINGS.maxRetries, 4)),
     requestDelayMs: Number(getSetting(SETTINGS.requestDelayMs, 120)),
+    maxConcurrentRequests: Number(getSetting(SETTINGS.maxConcurrentRequests, 4)),
+    connectionPoolSize: Number(getSetting(SETTINGS.connectionPoolSize, 0)),
+    hedgeRequests: Boolean(getSetting(SETTINGS.hedgeRequests, false)),
+    hedgePercentile: Number(getSetting(SETTINGS.hedgePercentile, 95)),
+    previewWorkers: Number(getSetting(SETTINGS.previewWorkers, 2)),
+    previewDelayMs: Number(getSetting(SETTINGS.previewDelayMs, 50)),
+    previewMaxDimension: Number(getSetting(SETTINGS.previewMaxDimension, 512)),
+    ffmpegConcurrency: Number(getSetting(SETTINGS.ffmpegConcurrency, 2)),
+    transcodeWorkers: Number(getSetting(SETTINGS.transcodeWorkers, 2)),
     useComfyPaths: Boolean(getSetting(SETTINGS.useComfyPaths, true)),
     useExtraModelPaths: Boolean(getSetting(SETTINGS.useExtraModelPaths, true)),
     useCustomPaths: Boolean(getSetting(SETTINGS.useCustomPaths, true)),
@@ -864,6 +949,39 @@ function timeAgo(isoString) {
   return `${days}d ago`;
 }
 
+function localPreviewFile(localVersions) {
+  const version = localVersions.find((v) => v.previewFileUrl);
+  return version ? version.previewFileUrl : "";
+}
+
+function localPreviewSrc(url, size) {
+  return api.apiURL(size ? `${url}&size=${size}` : url);
+}
+
+// Sidecars are always stills; a queued or deleted one falls back to the
+// remote image of *source* (never a video, which <img> cannot show).
+function localPreviewImg(url, size, source, attrs = "") {
+  const fallback = source.previewType === "video" ? "" : source.previewUrl || "";
+  return `<img src="${escapeHtml(localPreviewSrc(url, size))}" data-fallback="${escapeHtml(fallback)}" alt=""${attrs}>`;
+}
+
+function bindPreviewFallbacks(root) {
+  for (const img of root.querySelectorAll("img[data-fallback]")) {
+    img.addEventListener("error", () => {
+      const fallback = img.dataset.fallback;
+      delete img.dataset.fallback;
+      if (fallback) {
+        img.src = fallback;
+      } else {
+        img.replaceWith(Object.assign(document.createElement("div"), {
+          className: "cu-thumb-empty",
+          textContent: "No preview",
+        }));
+      }
+    }, { once: true });
+  }
+}
+
 function escapeHtml(text) {
   return String(text)
     .replaceAll("&", "&amp;")
@@ -880,22 +998,33 @@ function isTabVisible() {
 function openLightbox(item) {
   closeLightbox();
   const localVersions = item.localVersions || [];
-  const hasComparison = localVersions.some((v) => v.previewUrl) && item.previewUrl;
+  const hasComparison = localVersions.some((v) => v.previewUrl || v.previewFileUrl) && item.previewUrl;
 
   let sections = "";
   for (const v of localVersions) {
-    if (!v.previewUrl) continue;
+    if (!v.previewUrl && !v.previewFileUrl) continue;
     const base = v.baseModel ? ` <span class="cu-lb-base">${escapeHtml(v.baseModel)}</span>` : "";
-    const media = v.previewType === "video"
-      ? `<video src="${escapeHtml(v.previewUrl)}" preload="auto" muted playsinline controls></video>`
-      : `<img src="${escapeHtml(v.previewUrl)}" alt="">`;
+    let media;
+    if (v.previewFileUrl) {
+      media = localPreviewImg(v.previewFileUrl, 1024, v);
+    } else if (v.previewType === "video") {
+      media = `<video src="${escapeHtml(v.previewUrl)}" preload="auto" muted playsinline controls></video>`;
+    } else {
+      media = `<img src="${escapeHtml(v.previewUrl)}" alt="">`;
+    }
     sections += `<div class="cu-lb-card"><div class="cu-lb-label">Local</div><div class="cu-lb-vname">${escapeHtml(v.versionName || "?")}${base}</div>${media}</div>`;
   }
   if (item.previewUrl) {
     const latestBase = item.latestBaseModel ? ` <span class="cu-lb-base">${escapeHtml(item.latestBaseModel)}</span>` : "";
-    const media = item.previewType === "video"
-      ? `<video src="${escapeHtml(item.previewUrl)}" preload="auto" muted playsinline controls></video>`
-      : `<img src="${escapeHtml(item.previewUrl)}" alt="">`;
+    const localPreview = item.hasUpdate ? "" : localPreviewFile(localVersions);
+    let media;
+    if (localPreview) {
+      media = localPreviewImg(localPreview, 1024, item);
+    } else if (item.previewType === "video") {
+      media = `<video src="${escapeHtml(item.previewUrl)}" preload="auto" muted playsinline controls></video>`;
+    } else {
+      media = `<img src="${escapeHtml(item.previewUrl)}" alt="">`;
+    }
     sections += `<div class="cu-lb-card"><div class="cu-lb-label">Latest</div><div class="cu-lb-vname">${escapeHtml(item.latestVersionName || "?")}${latestBase}</div>${media}</div>`;
   }
 
@@ -915,6 +1044,7 @@ function openLightbox(item) {
     </div>`;
 
   document.body.appendChild(overlay);
+  bindPreviewFallbacks(overlay);
   requestAnimationFrame(() => overlay.classList.add("cu-lb-open"));
 
   overlay.querySelector(".cu-lb-backdrop").addEventListener("click", closeLightbox);